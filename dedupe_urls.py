@@ -1,99 +1,325 @@
 #!/usr/bin/env python3
 import json
+import os
 import sys
+from pathlib import Path
 from urllib.parse import urlparse
 import re
+from array import array
+import multiprocessing
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен - используем стандартный json
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson не установлен - читаем файл целиком
+    ijson = None
+
+# Номерной суффикс в конце URL: /news-2, /news-2/
+_NUM_SUFFIX_RE = re.compile(r'-\d+/?$')
+
+# С какого количества записей дедупликация распределяется по процессам
+PARALLEL_THRESHOLD = 200_000
+# Размер пачки записей, отдаваемой процессу шарды
+CHUNK_SIZE = 50_000
 
 def normalize_url(url):
     """Нормализует URL для сравнения"""
-    # http -> https
-    normalized = url.replace('http://', 'https://')
+    # Каждая замена выполняется только если она нужна: для уже
+    # нормализованного URL (типичный случай) новые строки не создаются
+
+    # http -> https (только схема; URL внутри query параметров не трогаем)
+    if url.startswith('http://'):
+        url = 'https' + url[4:]
     # Убираем :80
-    normalized = normalized.replace(':80/', '/')
+    if ':80/' in url:
+        url = url.replace(':80/', '/', 1)
     # Убираем trailing slash (кроме главной)
-    if normalized.endswith('/') and normalized.count('/') > 3:
-        normalized = normalized[:-1]
-    return normalized
+    if url.endswith('/') and url.count('/') > 3:
+        url = url[:-1]
+    return url
+
+def split_content_key(url):
+    """Возвращает (ключ контентной группировки, есть ли номерной суффикс)"""
+    # Один поиск суффикса и для ключа, и для признака номера
+    match = _NUM_SUFFIX_RE.search(url)
+    if match is not None:
+        url = url[:match.start()]
+    # Убираем query параметры и якорные ссылки
+    return url.split('?', 1)[0].split('#', 1)[0], match is not None
 
 def content_normalize_url(url):
     """Нормализует URL для контентной группировки"""
-    # Убираем номерные суффиксы
-    normalized = re.sub(r'-\d+/?$', '', url)
-    # Убираем query параметры
-    normalized = normalized.split('?')[0]
-    # Убираем якорные ссылки
-    normalized = normalized.split('#')[0]
-    return normalized
+    # Убираем номерные суффиксы, query параметры и якорные ссылки
+    return split_content_key(url)[0]
 
-def deduplicate_urls(input_file, output_file):
-    """Дедуплицирует URL в два этапа"""
+def _path_depth(url):
+    """Количество непустых сегментов пути (как len([p for p in url.split('/')[3:] if p]))"""
+    parts = url.split('/', 3)
+    if len(parts) < 4:
+        return 0
+    rest = parts[3]
+    # Пустые сегменты внутри пути встречаются редко - для них считаем по-старому
+    if '//' in rest:
+        return len([p for p in rest.split('/') if p])
+    return rest.count('/') + 1 - rest.startswith('/') - rest.endswith('/') if rest else 0
 
-    print(f"🔍 Читаем файл: {input_file}")
+def load_json(input_file):
+    """Читает JSON файл (через orjson, если он доступен)"""
+    if orjson is not None:
+        with open(input_file, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(input_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"❌ Ошибка чтения файла: {e}")
-        return
+def iter_items(input_file):
+    """Потоково отдает элементы JSON массива (через ijson, если он доступен)"""
+    if ijson is not None:
+        with open(input_file, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    else:
+        yield from load_json(input_file) or []
 
-    if not data:
-        print("❌ Файл пустой")
+class DedupState:
+    """Состояние дедупликации в виде параллельных массивов (struct-of-arrays)
+
+    Для каждой контентной группы хранится один индекс: по нему лежат
+    лучшая запись и ее признаки. При коллизии сравниваются элементы
+    массивов, а не поля словарей записей.
+
+    first_seen хранит номер записи во входном потоке, в которой
+    нормализованный URL встретился впервые: при полном равенстве приоритетов
+    побеждает URL, встреченный раньше (как при прежней двухэтапной
+    дедупликации). created - номер записи, открывшей группу: по нему
+    восстанавливается порядок групп после обработки по шардам.
+    """
+
+    def __init__(self):
+        self.key_to_id = {}
+        self.items = []
+        self.sizes = array('q')
+        self.is_https = bytearray()
+        self.has_number = bytearray()
+        self.orders = array('q')
+        self.created = array('q')
+        self.first_seen = {}
+
+    def __len__(self):
+        return len(self.items)
+
+def _dedup_offer(state, content_key, item, size, is_https, has_number, order):
+    """Предлагает запись как лучшую для группы content_key
+
+    order - номер первой записи с тем же нормализованным URL.
+    """
+    idx = state.key_to_id.get(content_key)
+    if idx is None:
+        # Группа новая, значит и ее нормализованный URL встретился впервые:
+        # order совпадает с номером текущей записи
+        state.key_to_id[content_key] = len(state.items)
+        state.items.append(item)
+        state.sizes.append(size)
+        state.is_https.append(is_https)
+        state.has_number.append(has_number)
+        state.orders.append(order)
+        state.created.append(order)
         return
 
-    print(f"📊 Исходных записей: {len(data)}")
+    # Приоритеты: без номера > с номером, HTTPS > HTTP, больший размер,
+    # раньше встреченный нормализованный URL (варианты одного URL с равными
+    # приоритетами не вытесняют первый)
+    current_has_number = state.has_number[idx]
+    current_is_https = state.is_https[idx]
+    current_size = state.sizes[idx]
 
-    # Этап 1: Протокольная дедупликация
-    protocol_dedup = {}
-    for item in data:
-        url = item['original']
-        normalized = normalize_url(url)
+    if (not has_number and current_has_number) or \
+            (has_number == current_has_number and
+             ((is_https and not current_is_https) or
+              (is_https == current_is_https and
+               (size > current_size or
+                (size == current_size and order < state.orders[idx]))))):
+        state.items[idx] = item
+        state.sizes[idx] = size
+        state.is_https[idx] = is_https
+        state.has_number[idx] = has_number
+        state.orders[idx] = order
 
-        if normalized not in protocol_dedup:
-            protocol_dedup[normalized] = item
-        else:
-            # Выбираем лучший вариант
-            current = protocol_dedup[normalized]
+def _dedup_keys(item):
+    """Возвращает (нормализованный URL, ключ контентной группы, есть ли номер)"""
+    normalized = normalize_url(item['original'])
+    return (normalized, *split_content_key(normalized))
 
-            # Приоритеты: HTTPS > HTTP, больший размер, свежее время
-            if (url.startswith('https://') and not current['original'].startswith('https://')) or \
-                    (url.startswith('https://') == current['original'].startswith('https://') and
-                     item['size'] > current['size']):
-                protocol_dedup[normalized] = item
+def _dedup_add(state, index, item, normalized, content_key, has_number):
+    """Добавляет запись с номером index во входном потоке и готовыми ключами"""
+    order = state.first_seen.setdefault(normalized, index)
+    _dedup_offer(state, content_key, item, item['size'],
+                 item['original'].startswith('https://'), has_number, order)
 
-    stage1_result = list(protocol_dedup.values())
-    print(f"✅ После протокольной дедупликации: {len(stage1_result)}")
+def _dedup_insert(item, state, index):
+    """Добавляет запись в дедупликацию: протокольную и контентную за один проход"""
+    _dedup_add(state, index, item, *_dedup_keys(item))
 
-    # Этап 2: Контентная дедупликация
-    content_dedup = {}
-    for item in stage1_result:
-        url = item['original']
-        content_key = content_normalize_url(url)
+def _dedup_append(state, other, idx, content_key):
+    """Переносит группу idx из other в state как новую"""
+    state.key_to_id[content_key] = len(state.items)
+    state.items.append(other.items[idx])
+    state.sizes.append(other.sizes[idx])
+    state.is_https.append(other.is_https[idx])
+    state.has_number.append(other.has_number[idx])
+    state.orders.append(other.orders[idx])
+    state.created.append(other.created[idx])
+
+def _dedup_split(state, count):
+    """Раскладывает состояние на count шард по hash(ключа группы) % count"""
+    shards = [DedupState() for _ in range(count)]
+    for content_key, idx in state.key_to_id.items():
+        _dedup_append(shards[hash(content_key) % count], state, idx, content_key)
+    for normalized, order in state.first_seen.items():
+        content_key = split_content_key(normalized)[0]
+        shards[hash(content_key) % count].first_seen[normalized] = order
+    return shards
+
+def _dedup_join(shards):
+    """Собирает шарды в одно состояние в порядке появления групп во входном потоке
 
-        if content_key not in content_dedup:
-            content_dedup[content_key] = item
+    Ключи групп в шардах не пересекаются, поэтому сравнивать записи не нужно.
+    """
+    state = DedupState()
+    groups = sorted(
+        (shard.created[idx], content_key, shard, idx)
+        for shard in shards
+        for content_key, idx in shard.key_to_id.items()
+    )
+    for _, content_key, shard, idx in groups:
+        _dedup_append(state, shard, idx, content_key)
+    for shard in shards:
+        state.first_seen.update(shard.first_seen)
+    return state
+
+def _dedup_shard(shard_id, state, batches, results):
+    """Дедуплицирует одну шарду (выполняется в отдельном процессе)
+
+    Записи приходят пачками с номерами во входном потоке; None - конец.
+    """
+    for batch in iter(batches.get, None):
+        for record in batch:
+            _dedup_add(state, *record)
+    results.put((shard_id, state))
+
+def _dedup_items(items, workers):
+    """Дедуплицирует поток записей, возвращает (состояние, количество записей)
+
+    Первые PARALLEL_THRESHOLD записей обрабатываются в текущем процессе.
+    Если записей больше, состояние раскладывается на workers шард по
+    hash(ключа группы) % workers, и каждая шарда дообрабатывается в своем
+    процессе. Все записи одной группы попадают в одну шарду вместе с
+    номерами во входном потоке, поэтому first_seen в шарде глобальный
+    и результат совпадает с одним проходом.
+    """
+    items = iter(items)
+    state = DedupState()
+    total = 0
+    for item in items:
+        _dedup_insert(item, state, total)
+        total += 1
+        if total >= PARALLEL_THRESHOLD and workers > 1:
+            break
+    else:
+        return state, total
+
+    # Ограниченные очереди: чтение файла притормаживает, если шарды не успевают
+    batches = [multiprocessing.Queue(maxsize=2) for _ in range(workers)]
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_dedup_shard, args=(shard_id, shard, batches[shard_id], results))
+        for shard_id, shard in enumerate(_dedup_split(state, workers))
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        # Ключи считаются здесь: по ним выбирается шарда
+        buffers = [[] for _ in range(workers)]
+        for item in items:
+            keys = _dedup_keys(item)
+            shard_id = hash(keys[1]) % workers
+            buffer = buffers[shard_id]
+            buffer.append((total, item, *keys))
+            total += 1
+            if len(buffer) >= CHUNK_SIZE:
+                batches[shard_id].put(buffer)
+                buffers[shard_id] = []
+        for shard_id, buffer in enumerate(buffers):
+            if buffer:
+                batches[shard_id].put(buffer)
+            batches[shard_id].put(None)
+
+        # Результаты забираем до join: процесс не завершится, пока его данные в очереди
+        shards = dict(results.get() for _ in processes)
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+
+    return _dedup_join([shards[shard_id] for shard_id in range(workers)]), total
+
+def dump_json(data, output_file, compact=False):
+    """Записывает JSON файл (через orjson, если он доступен)
+
+    По умолчанию - с отступами; compact=True пишет весь массив одной строкой
+    (быстрее и примерно вдвое меньше по размеру).
+    """
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        Path(output_file).write_bytes(orjson.dumps(data, option=option))
+        return
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+            f.write('\n')
         else:
-            current = content_dedup[content_key]
+            json.dump(data, f, indent=2, ensure_ascii=False)
 
-            # Приоритеты: без номера > с номером, больший размер
-            has_number = bool(re.search(r'-\d+/?$', url))
-            current_has_number = bool(re.search(r'-\d+/?$', current['original']))
+def deduplicate_urls(input_file, output_file, compact=False):
+    """Дедуплицирует URL: протокольные и контентные дубликаты"""
 
-            if (not has_number and current_has_number) or \
-                    (has_number == current_has_number and item['size'] > current['size']):
-                content_dedup[content_key] = item
+    print(f"🔍 Читаем файл: {input_file}")
 
-    final_result = list(content_dedup.values())
-    print(f"✅ После контентной дедупликации: {len(final_result)}")
+    # Протокольная и контентная дедупликация за один проход (вход читается
+    # потоково, в памяти остаются только лучшие варианты для каждой группы)
+    try:
+        state, total = _dedup_items(iter_items(input_file), os.cpu_count() or 1)
+    except Exception as e:
+        print(f"❌ Ошибка чтения файла: {e}")
+        return
 
-    # Добавляем priority_score
-    for item in final_result:
+    if not total:
+        print("❌ Файл пустой")
+        return
+
+    print(f"📊 Исходных записей: {total}")
+
+    final_result = state.items
+    print(f"✅ После дедупликации: {len(final_result)}")
+
+    # Добавляем priority_score (размер и признак HTTPS уже лежат в массивах состояния)
+    sizes = state.sizes
+    is_https = state.is_https
+    for idx, item in enumerate(final_result):
         url = item['original']
-        path_depth = len([p for p in url.split('/')[3:] if p])
-        size_score = item['size'] / 1000
-        depth_score = max(0, 50 - path_depth * 5)
-        https_bonus = 5 if url.startswith('https://') else 0
-        encoding_penalty = url.count('%')
+        size_score = sizes[idx] / 1000
+        depth_score = max(0, 50 - _path_depth(url) * 5)
+        https_bonus = 5 if is_https[idx] else 0
+        # Большинство URL без percent-encoding: проверка `in` дешевле вызова count
+        encoding_penalty = url.count('%') if '%' in url else 0
 
         item['priority_score'] = size_score + depth_score + https_bonus - encoding_penalty
 
@@ -102,18 +328,21 @@ def deduplicate_urls(input_file, output_file):
 
     # Сохраняем результат
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(final_result, f, indent=2, ensure_ascii=False)
+        dump_json(final_result, output_file, compact=compact)
         print(f"💾 Результат сохранен в: {output_file}")
     except Exception as e:
         print(f"❌ Ошибка записи файла: {e}")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Использование: python3 dedupe_urls.py input_file output_file")
+    args = sys.argv[1:]
+    compact = '--compact' in args
+    if compact:
+        args.remove('--compact')
+
+    if len(args) != 2:
+        print("Использование: python3 dedupe_urls.py [--compact] input_file output_file")
         sys.exit(1)
 
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    input_file, output_file = args
 
-    deduplicate_urls(input_file, output_file)
\ No newline at end of file
+    deduplicate_urls(input_file, output_file, compact=compact)
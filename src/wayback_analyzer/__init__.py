@@ -1,6 +1,6 @@
 from .core.client import WaybackClient
 from .core.storage_manager import StorageManager
-from .core.snapshot_crawler import SnapshotCrawler
+from .core.snapshot_crawler import SnapshotCrawler, AsyncSnapshotCrawler
 from .core.snapshot_downloader import SnapshotDownloader
 from .utils.rate_limiter import RateLimiter
 from .utils.url_helper import ArchiveUrlHelper
@@ -15,6 +15,7 @@ __all__ = [
     "WaybackClient",
     "StorageManager",
     "SnapshotCrawler",
+    "AsyncSnapshotCrawler",
     "SnapshotDownloader",
     "RateLimiter",
     "ArchiveUrlHelper",
@@ -51,11 +51,13 @@ def test():
 @click.option('--max-pages', default=500, help='Максимальное количество страниц')
 @click.option('--max-depth', default=4, help='Максимальная глубина обхода')
 @click.option('--rate-limit', default=2.0, help='Задержка между запросами')
-def crawl_political_site(site_url, target_date, output_dir, max_pages, max_depth, rate_limit):
+@click.option('--concurrency', default=1, help='Количество одновременных загрузок страниц')
+def crawl_political_site(site_url, target_date, output_dir, max_pages, max_depth, rate_limit, concurrency):
     """Полный обход политического сайта."""
+    import asyncio
     from pathlib import Path
     from ..core.storage_manager import StorageManager
-    from ..core.enhanced_crawler import EnhancedSnapshotCrawler
+    from ..core.enhanced_crawler import EnhancedSnapshotCrawler, AsyncEnhancedSnapshotCrawler
     from ..utils.rate_limiter import RateLimiter
 
     click.echo(f"🇺🇦 Обход сайта: {site_url}")
@@ -63,15 +65,27 @@ def crawl_political_site(site_url, target_date, output_dir, max_pages, max_depth
     storage_manager = StorageManager(Path(output_dir))
     rate_limiter = RateLimiter(requests_per_second=1.0/rate_limit)
 
-    crawler = EnhancedSnapshotCrawler(
-        storage_manager=storage_manager,
-        rate_limiter=rate_limiter,
-        max_depth=max_depth,
-        max_pages=max_pages
-    )
+    if concurrency > 1:
+        crawler = AsyncEnhancedSnapshotCrawler(
+            storage_manager=storage_manager,
+            rate_limiter=rate_limiter,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            max_concurrent=concurrency
+        )
+    else:
+        crawler = EnhancedSnapshotCrawler(
+            storage_manager=storage_manager,
+            rate_limiter=rate_limiter,
+            max_depth=max_depth,
+            max_pages=max_pages
+        )
 
     try:
-        summary = crawler.crawl_political_site(site_url, target_date)
+        if concurrency > 1:
+            summary = asyncio.run(crawler.crawl_political_site(site_url, target_date))
+        else:
+            summary = crawler.crawl_political_site(site_url, target_date)
         click.echo(f"✅ Завершено: {summary['total_pages_found']} страниц")
     except Exception as e:
         click.echo(f"❌ Ошибка: {e}")
@@ -85,7 +99,7 @@ def crawl_political_site(site_url, target_date, output_dir, max_pages, max_depth
 @click.option('--resume', is_flag=True, help='Продолжить прерванную загрузку')
 def download_snapshot(domain, date, output_dir, rate_limit, max_concurrent, resume):
     """Скачать снапшот сайта на конкретную дату из подготовленного списка URL."""
-    import json
+    import orjson
     import asyncio
     from pathlib import Path
     from ..core.snapshot_downloader import SnapshotDownloader
@@ -110,8 +124,8 @@ def download_snapshot(domain, date, output_dir, rate_limit, max_concurrent, resu
 
     # Читаем список снапшотов
     try:
-        with open(snapshots_file, 'r', encoding='utf-8') as f:
-            snapshots = json.load(f)
+        with open(snapshots_file, 'rb') as f:
+            snapshots = orjson.loads(f.read())
     except Exception as e:
         click.echo(f"❌ Ошибка чтения файла снапшотов: {e}")
         return
@@ -133,12 +147,13 @@ def download_snapshot(domain, date, output_dir, rate_limit, max_concurrent, resu
         resume_mode=resume
     )
 
+    async def run_download():
+        async with downloader:
+            return await downloader.download_snapshot_batch(domain, date, snapshots)
+
     # Запуск асинхронного скачивания
     try:
-        loop = asyncio.get_event_loop()
-        result = loop.run_until_complete(
-            downloader.download_snapshot_batch(domain, date, snapshots)
-        )
+        result = asyncio.run(run_download())
 
         click.echo(f"\n✅ Скачивание завершено!")
         click.echo(f"📄 Успешно: {result['successful']}")
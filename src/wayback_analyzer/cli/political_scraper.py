@@ -7,7 +7,7 @@ import logging
 
 from ..models.political_events import UKRAINE_POLITICAL_EVENTS, EventType
 from ..core.snapshot_finder import PoliticalSnapshotFinder
-from ..core.site_crawler import ArchiveSiteCrawler
+from ..core.site_crawler import ArchiveSiteCrawler, AsyncArchiveSiteCrawler
 from ..core.content_downloader import MassContentDownloader
 from ..core.storage_manager import StorageManager
 from ..utils.rate_limiter import RateLimiter
@@ -28,8 +28,9 @@ def political():
 @click.option('--output-dir', default='./political_data', help='Директория для сохранения данных')
 @click.option('--max-depth', default=2, help='Максимальная глубина обхода сайта')
 @click.option('--rate-limit', default=1.0, help='Задержка между запросами (секунды)')
+@click.option('--concurrency', default=1, help='Количество одновременных загрузок при обходе снапшота')
 def scrape_political_site(site_url, event_dates, event_types, days_before, days_after,
-                          output_dir, max_depth, rate_limit):
+                          output_dir, max_depth, rate_limit, concurrency):
     """Собрать данные политического сайта для ключевых событий."""
 
     # Настройка логирования
@@ -37,12 +38,20 @@ def scrape_political_site(site_url, event_dates, event_types, days_before, days_
 
     click.echo(f"🇺🇦 Анализ политического сайта: {site_url}")
 
+    # Домен и имя сайта не зависят от события/снапшота - считаем один раз
+    site_path = site_url.replace('http://', '').replace('https://', '')
+    domain = site_path.split('/')[0]
+    site_name = site_path.replace('/', '_')
+
     # Инициализация компонентов
-    rate_limiter = RateLimiter(delay=rate_limit)
+    rate_limiter = RateLimiter(requests_per_second=1.0 / rate_limit)
     storage_manager = StorageManager(base_path=Path(output_dir))
     snapshot_finder = PoliticalSnapshotFinder()
-    site_crawler = ArchiveSiteCrawler(rate_limiter, max_depth=max_depth)
-    content_downloader = MassContentDownloader(storage_manager)
+    if concurrency > 1:
+        site_crawler = AsyncArchiveSiteCrawler(rate_limiter, max_depth=max_depth, max_concurrent=concurrency)
+    else:
+        site_crawler = ArchiveSiteCrawler(rate_limiter, max_depth=max_depth)
+    content_downloader = MassContentDownloader(storage_manager, rate_limiter=rate_limiter)
 
     # Определяем события для анализа
     events_to_analyze = []
@@ -74,59 +83,61 @@ def scrape_political_site(site_url, event_dates, event_types, days_before, days_
 
     click.echo(f"📅 Будет проанализировано {len(events_to_analyze)} событий")
 
-    # Анализируем каждое событие
-    for event in events_to_analyze:
-        click.echo(f"\n🔍 Анализ события: {event.name if hasattr(event, 'name') else event['name']}")
-
-        # Находим снапшоты
-        snapshots = snapshot_finder.find_event_snapshots(
-            site_url, event, days_before, days_after
-        ) if hasattr(event, 'name') else snapshot_finder.find_event_snapshots(
-            site_url, event, days_before, days_after
-        )
+    # Одна session краулера на все снапшоты всех событий, закрывается в конце
+    with site_crawler:
+        # Анализируем каждое событие
+        for event in events_to_analyze:
+            click.echo(f"\n🔍 Анализ события: {event.name if hasattr(event, 'name') else event['name']}")
+
+            # Находим снапшоты
+            snapshots = snapshot_finder.find_event_snapshots(
+                site_url, event, days_before, days_after
+            ) if hasattr(event, 'name') else snapshot_finder.find_event_snapshots(
+                site_url, event, days_before, days_after
+            )
 
-        total_snapshots = len(snapshots['before_event']) + len(snapshots['after_event'])
-        click.echo(f"  📸 Найдено снапшотов: {total_snapshots}")
+            total_snapshots = len(snapshots['before_event']) + len(snapshots['after_event'])
+            click.echo(f"  📸 Найдено снапшотов: {total_snapshots}")
 
-        if total_snapshots == 0:
-            click.echo("  ⚠️  Снапшотов не найдено, пропускаем")
-            continue
+            if total_snapshots == 0:
+                click.echo("  ⚠️  Снапшотов не найдено, пропускаем")
+                continue
 
-        # Обходим структуру каждого снапшота
-        all_pages = []
+            # Обходим структуру каждого снапшота
+            all_pages = []
 
-        for period, snapshot_list in [('before', snapshots['before_event']),
-                                      ('after', snapshots['after_event'])]:
+            for period, snapshot_list in [('before', snapshots['before_event']),
+                                          ('after', snapshots['after_event'])]:
 
-            for snapshot in snapshot_list[:3]:  # Ограничиваем для примера
-                click.echo(f"    🕷️  Обход снапшота {snapshot['timestamp']} ({period})")
+                for snapshot in snapshot_list[:3]:  # Ограничиваем для примера
+                    click.echo(f"    🕷️  Обход снапшота {snapshot['timestamp']} ({period})")
 
-                domain = site_url.replace('http://', '').replace('https://', '').split('/')[0]
-                pages = site_crawler.discover_site_structure(snapshot['url'], domain)
+                    if concurrency > 1:
+                        pages = asyncio.run(site_crawler.discover_site_structure(snapshot['url'], domain))
+                    else:
+                        pages = site_crawler.discover_site_structure(snapshot['url'], domain)
 
-                # Добавляем метаинформацию к каждой странице
-                for page in pages:
-                    page['event_period'] = period
-                    page['event_name'] = event.name if hasattr(event, 'name') else event['name']
-                    page['snapshot_date'] = snapshot['date']
+                    # Добавляем метаинформацию к каждой странице
+                    for page in pages:
+                        page['event_period'] = period
+                        page['event_name'] = event.name if hasattr(event, 'name') else event['name']
+                        page['snapshot_date'] = snapshot['date']
 
-                all_pages.extend(pages)
+                    all_pages.extend(pages)
 
-        click.echo(f"  📄 Найдено страниц для загрузки: {len(all_pages)}")
+            click.echo(f"  📄 Найдено страниц для загрузки: {len(all_pages)}")
 
-        # Загружаем весь контент
-        if all_pages:
-            click.echo(f"  ⬇️  Загрузка контента...")
+            # Загружаем весь контент
+            if all_pages:
+                click.echo(f"  ⬇️  Загрузка контента...")
 
-            site_name = site_url.replace('http://', '').replace('https://', '').replace('/', '_')
-            event_name = event.name if hasattr(event, 'name') else event['name']
+                event_name = event.name if hasattr(event, 'name') else event['name']
 
-            loop = asyncio.get_event_loop()
-            result = loop.run_until_complete(
-                content_downloader.download_all_pages(all_pages, site_name, event_name)
-            )
+                result = asyncio.run(
+                    content_downloader.download_all_pages(all_pages, site_name, event_name)
+                )
 
-            click.echo(f"  ✅ Загружено: {result['successful']} страниц, ошибок: {result['failed']}")
+                click.echo(f"  ✅ Загружено: {result['successful']} страниц, ошибок: {result['failed']}")
 
     click.echo(f"\n🎉 Анализ завершен! Данные сохранены в: {output_dir}")
 
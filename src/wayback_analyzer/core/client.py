@@ -1,6 +1,7 @@
 """Main client for interacting with Wayback Machine."""
 
 import logging
+from itertools import islice
 from typing import List
 from waybackpy import WaybackMachineCDXServerAPI
 
@@ -16,15 +17,10 @@ class WaybackClient:
     def get_snapshots(self, url: str, limit: int = 10) -> List[str]:
         """Get archived snapshots for a URL."""
         try:
-            cdx_api = WaybackMachineCDXServerAPI(url, self.user_agent)
-            snapshots = []
-
-            for snapshot in cdx_api.snapshots():
-                snapshots.append(snapshot.archive_url)
-                if len(snapshots) >= limit:
-                    break
-
-            return snapshots
+            # The CDX server returns at most `limit` rows per page; islice stops
+            # the generator before it requests the next page via the resume key.
+            cdx_api = WaybackMachineCDXServerAPI(url, self.user_agent, limit=limit)
+            return [snapshot.archive_url for snapshot in islice(cdx_api.snapshots(), limit)]
 
         except Exception as e:
             logger.error(f"Failed to get snapshots for {url}: {e}")
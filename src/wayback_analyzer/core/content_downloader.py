@@ -3,65 +3,89 @@ import asyncio
 import aiohttp
 import aiofiles
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
+from ..utils.html_encoding import charset_from_content_type, decode_html
+from ..utils.rate_limiter import RateLimiter
 from ..utils.retry_handler import RetryHandler
 from ..core.storage_manager import StorageManager
 
 class MassContentDownloader:
-    def __init__(self, storage_manager: StorageManager, max_concurrent: int = 5):
+    def __init__(
+            self,
+            storage_manager: StorageManager,
+            max_concurrent: int = 5,
+            rate_limiter: Optional[RateLimiter] = None
+    ):
         self.storage_manager = storage_manager
         self.max_concurrent = max_concurrent
+        # Общий лимитер на все корутины (по умолчанию ~2 запроса в секунду)
+        self.rate_limiter = rate_limiter or RateLimiter(requests_per_second=2.0)
         self.retry_handler = RetryHandler(max_retries=3, backoff_factor=2)
         self.session = None
 
     async def download_all_pages(self, pages: List[Dict], site_name: str, event_name: str):
         """Массово загрузить все страницы сайта."""
 
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
+        # Keep-alive и DNS кэш: соединение с web.archive.org переиспользуется
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_concurrent,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
         timeout = aiohttp.ClientTimeout(total=60)
 
         async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
             self.session = session
 
-            # Создаем семафор для ограничения конкурентности
-            semaphore = asyncio.Semaphore(self.max_concurrent)
+            # Фиксированный пул воркеров вместо задачи на каждую страницу:
+            # в памяти не больше max_concurrent корутин одновременно
+            pages_iter = iter(pages)
+            successful = 0
+            failed = 0
 
-            # Создаем задачи для всех страниц
-            tasks = []
-            for page in pages:
-                task = self._download_single_page(semaphore, page, site_name, event_name)
-                tasks.append(task)
+            async def worker():
+                nonlocal successful, failed
+                for page in pages_iter:
+                    try:
+                        ok = await self._download_single_page(page, site_name, event_name)
+                    except Exception:
+                        ok = False
 
-            # Выполняем все задачи
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+                    if ok is True:
+                        successful += 1
+                    else:
+                        failed += 1
 
-            # Подсчитываем результаты
-            successful = sum(1 for r in results if r is True)
-            failed = len(results) - successful
+            await asyncio.gather(*(worker() for _ in range(self.max_concurrent)))
 
             logging.info(f"Загрузка завершена: {successful} успешно, {failed} ошибок")
 
             return {'successful': successful, 'failed': failed}
 
-    async def _download_single_page(self, semaphore: asyncio.Semaphore, page: Dict, site_name: str, event_name: str):
+    async def _download_single_page(self, page: Dict, site_name: str, event_name: str):
         """Загрузить одну страницу с повторными попытками."""
 
-        async with semaphore:
-            return await self.retry_handler.execute_with_retry(
-                self._fetch_and_save_page, page, site_name, event_name
-            )
+        return await self.retry_handler.execute_with_retry(
+            self._fetch_and_save_page, page, site_name, event_name
+        )
 
     async def _fetch_and_save_page(self, page: Dict, site_name: str, event_name: str) -> bool:
         """Загрузить и сохранить HTML страницы."""
 
         try:
-            # Небольшая задержка между запросами
-            await asyncio.sleep(0.5)
+            # Соблюдаем общий rate limit
+            await self.rate_limiter.acquire()
 
             async with self.session.get(page['archive_url']) as response:
                 if response.status == 200:
-                    content = await response.text()
+                    # Декодируем один раз по кодировке ответа или страницы: на диск
+                    # пишется UTF-8, исходная кодировка сохраняется в метаданных
+                    raw = await response.read()
+                    content, page['source_charset'] = decode_html(
+                        raw, charset_from_content_type(response.headers.get('Content-Type'))
+                    )
 
                     # Сохраняем контент
                     file_path = self.storage_manager.save_page_content(
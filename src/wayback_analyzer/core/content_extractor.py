@@ -1,20 +1,140 @@
 """Экстрактор контента из сохраненных HTML страниц."""
 
-import json
+import logging
 import re
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from bs4 import BeautifulSoup, Comment
+from typing import Callable, Dict, List, Optional, Any, Type, Union
+
+import ahocorasick
+import orjson
 from dataclasses import dataclass
 from datetime import datetime
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 from .storage_manager import StorageManager
+from ..utils.html_encoding import decode_html
+
+
+# Паттерны для поиска цитат и обещаний (компилируются один раз на модуль)
+_QUOTE_RES = [
+    re.compile(r'"([^"]{20,200})"', re.IGNORECASE | re.DOTALL),  # Текст в кавычках
+    re.compile(r'«([^»]{20,200})»', re.IGNORECASE | re.DOTALL),  # Текст в украинских кавычках
+]
+
+_PROMISE_RES = [
+    re.compile(
+        r'((?:ми|партія|слуга народу).{0,50}(?:обіцяємо|зобов\'язуємося|плануємо|будемо).{10,200})',
+        re.IGNORECASE | re.DOTALL
+    ),
+    re.compile(r'((?:наша мета|наше завдання|ми досягнемо).{10,150})', re.IGNORECASE | re.DOTALL),
+]
+
+# Те же паттерны обещаний без IGNORECASE - для поиска по text.casefold().
+# Литералы паттернов уже в casefold-форме, а для каждой их буквы множество
+# символов, совпадающих с ней по IGNORECASE, равно множеству символов с тем же
+# casefold. Поэтому, если casefold не меняет длину текста (символы
+# отображаются один в один), совпадения и позиции те же, а без IGNORECASE
+# движок regex работает в 2-3 раза быстрее на кириллице
+_PROMISE_FOLDED_RES = [re.compile(pattern.pattern, re.DOTALL) for pattern in _PROMISE_RES]
+
+# Подстроки, без которых соответствующий паттерн совпасть не может: дешевая
+# проверка `in` позволяет не запускать регулярку на страницах без них.
+# Для обещаний проверка идет по text.casefold() (не строже IGNORECASE)
+_QUOTE_TRIGGERS = ['"', '«']
+_PROMISE_TRIGGERS = [
+    ('обіцяємо', 'зобов\'язуємося', 'плануємо', 'будемо'),
+    ('наша мета', 'наше завдання', 'ми досягнемо'),
+]
+
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+_HEADINGS_SELECTOR = ', '.join(_HEADING_TAGS)
+
+# Контейнеры навигационных меню
+_MENU_SELECTOR = ', '.join([
+    'nav', '.menu', '.navigation', '.nav',
+    '.primary-menu', '.main-menu', '.header-menu'
+])
+
+# Политические ключевые слова по категориям
+POLITICAL_KEYWORDS = {
+    # Общие политические термины
+    'общие': [
+        'реформа', 'реформи', 'зміни', 'програма', 'платформа',
+        'ідеологія', 'принципи', 'цінності', 'мета', 'завдання'
+    ],
+
+    # Обещания и планы
+    'обещания': [
+        'обіцяємо', 'зобов\'язуємося', 'плануємо', 'будемо',
+        'реалізуємо', 'впровадимо', 'забезпечимо', 'створимо',
+        'побудуємо', 'досягнемо', 'змінимо'
+    ],
+
+    # Критика и оппозиция
+    'критика': [
+        'корупція', 'олігархи', 'стара влада', 'система',
+        'бездіяльність', 'неефективність', 'провал', 'криза'
+    ],
+
+    # Ключевые темы для Украины
+    'темы': [
+        'децентралізація', 'євроінтеграція', 'нато', 'безпека',
+        'економіка', 'освіта', 'медицина', 'пенсії', 'зарплати',
+        'армія', 'війна', 'мир', 'територіальна цілісність'
+    ]
+}
+
+
+def _build_keyword_automaton(
+        political_keywords: Dict[str, List[str]]
+) -> tuple[List[str], List[List[int]], ahocorasick.Automaton]:
+    """Построить автомат Aho-Corasick по словарю ключевых слов.
+
+    Возвращает метки "категория: слово" в порядке словаря, индексы меток
+    для каждого уникального слова и автомат, значение в котором - номер слова.
+    """
+    labels = []
+    word_labels: List[List[int]] = []
+    word_ids: Dict[str, int] = {}
+    automaton = ahocorasick.Automaton()
+
+    for category, keywords in political_keywords.items():
+        for keyword in keywords:
+            # Одно слово может встречаться в нескольких категориях
+            key = keyword.lower()
+            word_id = word_ids.get(key)
+            if word_id is None:
+                word_id = word_ids[key] = len(word_labels)
+                word_labels.append([])
+                automaton.add_word(key, word_id)
+            word_labels[word_id].append(len(labels))
+            labels.append(f"{category}: {keyword}")
+
+    automaton.make_automaton()
+    return labels, word_labels, automaton
+
+
+_KEYWORD_INDEX = _build_keyword_automaton(POLITICAL_KEYWORDS)
 
 
 @dataclass
 class ExtractedContent:
     """Структура извлеченного контента."""
 
+    # Экземпляров может быть много (extract_detailed_content): без __dict__.
+    # dataclass(slots=True) требует Python 3.10, поэтому слоты заданы вручную
+    __slots__ = (
+        'url', 'title', 'timestamp',
+        'main_text', 'headings', 'paragraphs',
+        'menu_links', 'internal_links', 'external_links',
+        'political_keywords', 'quotes', 'promises',
+        'word_count', 'language', 'extraction_date'
+    )
+
     # Базовая информация
     url: str
     title: str
@@ -45,88 +165,63 @@ class PoliticalContentExtractor:
     """Экстрактор политического контента из HTML."""
 
     def __init__(self):
-        self.political_keywords = {
-            # Общие политические термины
-            'общие': [
-                'реформа', 'реформи', 'зміни', 'програма', 'платформа',
-                'ідеологія', 'принципи', 'цінності', 'мета', 'завдання'
-            ],
-
-            # Обещания и планы
-            'обещания': [
-                'обіцяємо', 'зобов\'язуємося', 'плануємо', 'будемо',
-                'реалізуємо', 'впровадимо', 'забезпечимо', 'створимо',
-                'побудуємо', 'досягнемо', 'змінимо'
-            ],
-
-            # Критика и оппозиция
-            'критика': [
-                'корупція', 'олігархи', 'стара влада', 'система',
-                'бездіяльність', 'неефективність', 'провал', 'криза'
-            ],
-
-            # Ключевые темы для Украины
-            'темы': [
-                'децентралізація', 'євроінтеграція', 'нато', 'безпека',
-                'економіка', 'освіта', 'медицина', 'пенсії', 'зарплати',
-                'армія', 'війна', 'мир', 'територіальна цілісність'
-            ]
-        }
+        # Словарь ключевых слов, паттерны и автомат общие для всех экземпляров
+        # (строятся один раз при импорте модуля)
+        self.political_keywords = POLITICAL_KEYWORDS
+
+        # Автомат Aho-Corasick по всем ключевым словам: текст сканируется один раз
+        self._keyword_labels, self._keyword_word_labels, self._keyword_automaton = _KEYWORD_INDEX
 
         # Паттерны для поиска цитат и обещаний
-        self.quote_patterns = [
-            r'"([^"]{20,200})"',  # Текст в кавычках
-            r'«([^»]{20,200})»',  # Текст в украинских кавычках
-        ]
+        self.quote_patterns = _QUOTE_RES
+        self.promise_patterns = _PROMISE_RES
 
-        self.promise_patterns = [
-            r'((?:ми|партія|слуга народу).{0,50}(?:обіцяємо|зобов\'язуємося|плануємо|будемо).{10,200})',
-            r'((?:наша мета|наше завдання|ми досягнемо).{10,150})',
-        ]
+    def extract_from_html_file(self, file_path: Path, has_meta: Optional[bool] = None) -> ExtractedContent:
+        """Извлечь контент из HTML файла.
 
-    def extract_from_html_file(self, file_path: Path) -> ExtractedContent:
-        """Извлечь контент из HTML файла."""
+        has_meta - известно ли заранее, есть ли рядом .html.meta.json
+        (None - проверить на диске).
+        """
 
-        # Читаем HTML файл
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        # Читаем HTML файл байтами; кодировка определяется в extract_from_html
+        html_content = file_path.read_bytes()
 
         # Читаем метаданные если есть
         meta_path = file_path.with_suffix('.html.meta.json')
         metadata = {}
-        if meta_path.exists():
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+        if meta_path.exists() if has_meta is None else has_meta:
+            metadata = orjson.loads(meta_path.read_bytes())
 
         return self.extract_from_html(html_content, metadata)
 
-    def extract_from_html(self, html_content: str, metadata: Dict = None) -> ExtractedContent:
+    def extract_from_html(self, html_content: Union[str, bytes], metadata: Dict = None) -> ExtractedContent:
         """Извлечь контент из HTML строки."""
 
         if metadata is None:
             metadata = {}
 
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Lexbor декодирует bytes только как UTF-8 и не смотрит на <meta charset>,
+        # поэтому страницы в cp1251/koi8-u декодируем сами и передаем str
+        if isinstance(html_content, bytes):
+            html_content, _ = decode_html(html_content)
 
-        # Удаляем скрипты и стили
-        for element in soup(['script', 'style', 'nav', 'footer', 'aside']):
-            element.decompose()
+        # Lexbor (C-парсер) вместо BeautifulSoup: разбор в разы быстрее,
+        # комментарии в текст узлов не попадают
+        tree = LexborHTMLParser(html_content)
 
-        # Удаляем комментарии
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            comment.extract()
+        # Удаляем скрипты и стили
+        tree.strip_tags(['script', 'style', 'nav', 'footer', 'aside'])
 
         # Базовая информация
-        title = self._extract_title(soup)
-        main_text = self._extract_main_text(soup)
+        title = self._extract_title(tree)
+        main_text = self._extract_main_text(tree)
 
         # Структурированный контент
-        headings = self._extract_headings(soup)
-        paragraphs = self._extract_paragraphs(soup)
+        headings = self._extract_headings(tree)
+        paragraphs = self._extract_paragraphs(tree)
 
         # Ссылки
-        menu_links = self._extract_menu_links(soup)
-        internal_links, external_links = self._extract_links(soup)
+        menu_links, internal_links, external_links = self._extract_links(tree)
 
         # Политический анализ
         political_keywords = self._find_political_keywords(main_text)
@@ -151,19 +246,19 @@ class PoliticalContentExtractor:
             extraction_date=datetime.now().isoformat()
         )
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    def _extract_title(self, tree: LexborHTMLParser) -> str:
         """Извлечь заголовок страницы."""
-        title_tag = soup.find('title')
+        title_tag = tree.css_first('title')
         if title_tag:
-            return title_tag.get_text().strip()
+            return title_tag.text().strip()
 
-        h1_tag = soup.find('h1')
+        h1_tag = tree.css_first('h1')
         if h1_tag:
-            return h1_tag.get_text().strip()
+            return h1_tag.text().strip()
 
         return "Без заголовка"
 
-    def _extract_main_text(self, soup: BeautifulSoup) -> str:
+    def _extract_main_text(self, tree: LexborHTMLParser) -> str:
         """Извлечь основной текст страницы."""
 
         # Ищем основной контент в специальных тегах
@@ -172,91 +267,84 @@ class PoliticalContentExtractor:
             '.post-content', '.entry-content', '#content'
         ]
 
-        main_content = None
+        main_content: Optional[LexborNode] = None
         for selector in main_selectors:
-            main_content = soup.select_one(selector)
+            main_content = tree.css_first(selector)
             if main_content:
                 break
 
         if not main_content:
-            main_content = soup.find('body')
+            main_content = tree.body
 
         if main_content:
-            # Очищаем от ненужных элементов
-            for unwanted in main_content.find_all(['nav', 'footer', 'aside', 'header']):
-                unwanted.decompose()
+            # nav, footer и aside уже удалены из всего документа, внутри
+            # основного блока осталось убрать только header
+            main_content.strip_tags(['header'])
 
-            text = main_content.get_text(separator=' ', strip=True)
-            # Очищаем множественные пробелы
-            text = re.sub(r'\s+', ' ', text)
-            return text.strip()
+            text = main_content.text(separator=' ', strip=True)
+            # Очищаем множественные пробелы: split() без аргументов делит по тем же
+            # пробельным символам, что и \s, и заодно отбрасывает крайние
+            return ' '.join(text.split())
 
-        return soup.get_text(separator=' ', strip=True)
+        return tree.text(separator=' ', strip=True)
 
-    def _extract_headings(self, soup: BeautifulSoup) -> Dict[str, List[str]]:
+    def _extract_headings(self, tree: LexborHTMLParser) -> Dict[str, List[str]]:
         """Извлечь заголовки по уровням."""
-        headings = {}
+        by_level: Dict[str, List[str]] = {}
 
-        for level in range(1, 7):  # h1-h6
-            tag_name = f'h{level}'
-            tags = soup.find_all(tag_name)
-            if tags:
-                headings[tag_name] = [tag.get_text().strip() for tag in tags if tag.get_text().strip()]
+        # Один обход дерева для всех уровней h1-h6 (узлы в порядке документа)
+        for tag in tree.css(_HEADINGS_SELECTOR):
+            level_headings = by_level.setdefault(tag.tag, [])
+            text = tag.text().strip()
+            if text:
+                level_headings.append(text)
 
-        return headings
+        # Уровни - по порядку h1..h6; уровень с одними пустыми заголовками сохраняется
+        return {tag_name: by_level[tag_name] for tag_name in _HEADING_TAGS if tag_name in by_level}
 
-    def _extract_paragraphs(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_paragraphs(self, tree: LexborHTMLParser) -> List[str]:
         """Извлечь абзацы текста."""
-        paragraphs = soup.find_all('p')
+        paragraphs = tree.css('p')
 
         result = []
         for p in paragraphs:
-            text = p.get_text().strip()
+            text = p.text().strip()
             if len(text) > 20:  # Игнорируем слишком короткие абзацы
                 result.append(text)
 
         return result
 
-    def _extract_menu_links(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """Извлечь ссылки из меню навигации."""
-        menu_links = []
-
-        # Ищем навигационные меню
-        nav_selectors = [
-            'nav', '.menu', '.navigation', '.nav',
-            '.primary-menu', '.main-menu', '.header-menu'
-        ]
-
-        for selector in nav_selectors:
-            nav_elements = soup.select(selector)
-            for nav in nav_elements:
-                links = nav.find_all('a', href=True)
-                for link in links:
-                    href = link.get('href', '')
-                    text = link.get_text().strip()
-                    if text and href:
-                        menu_links.append({
-                            'text': text,
-                            'url': href,
-                            'type': 'menu'
-                        })
-
-        return menu_links
-
-    def _extract_links(self, soup: BeautifulSoup) -> tuple[List[Dict[str, str]], List[Dict[str, str]]]:
-        """Извлечь внутренние и внешние ссылки."""
-        all_links = soup.find_all('a', href=True)
+    def _extract_links(
+            self,
+            tree: LexborHTMLParser
+    ) -> tuple[List[Dict[str, str]], List[Dict[str, str]], List[Dict[str, str]]]:
+        """Извлечь ссылки меню, внутренние и внешние ссылки за один проход по якорям."""
+
+        # Якоря внутри навигационных меню (mem_id - адрес узла в дереве)
+        menu_link_ids = {
+            link.mem_id
+            for nav in tree.css(_MENU_SELECTOR)
+            for link in nav.css('a[href]')
+        }
 
+        menu_links = []
         internal_links = []
         external_links = []
 
-        for link in all_links:
-            href = link.get('href', '')
-            text = link.get_text().strip()
+        for link in tree.css('a[href]'):
+            href = link.attributes.get('href') or ''
+            text = link.text().strip()
 
             if not text or not href:
                 continue
 
+            if link.mem_id in menu_link_ids:
+                menu_links.append({
+                    'text': text,
+                    'url': href,
+                    'type': 'menu'
+                })
+
             link_data = {
                 'text': text,
                 'url': href
@@ -270,53 +358,137 @@ class PoliticalContentExtractor:
             elif href.startswith(('http://', 'https://')):
                 external_links.append(link_data)
 
-        return internal_links, external_links
+        return menu_links, internal_links, external_links
 
     def _find_political_keywords(self, text: str) -> List[str]:
         """Найти политические ключевые слова в тексте."""
-        found_keywords = []
-        text_lower = text.lower()
-
-        for category, keywords in self.political_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    found_keywords.append(f"{category}: {keyword}")
+        # Совпадений может быть много: собираем номера слов без цикла на Python
+        found_words = set(map(itemgetter(1), self._keyword_automaton.iter(text.lower())))
 
-        return found_keywords
+        # Порядок результата - как в словаре ключевых слов
+        found = sorted(i for word_id in found_words for i in self._keyword_word_labels[word_id])
+        return [self._keyword_labels[i] for i in found]
 
     def _extract_quotes(self, text: str) -> List[str]:
-        """Извлечь цитаты из текста."""
+        """Извлечь цитаты из текста (каждую - один раз, в порядке появления)."""
         quotes = []
+        seen = set()
 
-        for pattern in self.quote_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
-            for match in matches:
+        for pattern, trigger in zip(self.quote_patterns, _QUOTE_TRIGGERS):
+            if trigger not in text:
+                continue
+            for match in pattern.finditer(text):
                 quote = match.group(1).strip()
                 if len(quote) > 20:
-                    quotes.append(quote)
+                    key = quote.lower()
+                    if key not in seen:
+                        seen.add(key)
+                        quotes.append(quote)
 
         return quotes
 
     def _extract_promises(self, text: str) -> List[str]:
-        """Извлечь обещания и заявления из текста."""
+        """Извлечь обещания и заявления из текста (каждое - один раз, в порядке появления)."""
         promises = []
+        seen = set()
+        text_folded = text.casefold()
+        # Позиции в text_folded совпадают с позициями в text
+        search_folded = len(text_folded) == len(text)
+
+        for pattern, folded_pattern, triggers in zip(
+                self.promise_patterns, _PROMISE_FOLDED_RES, _PROMISE_TRIGGERS
+        ):
+            if not any(trigger in text_folded for trigger in triggers):
+                continue
+
+            if search_folded:
+                matches = folded_pattern.finditer(text_folded)
+            else:
+                matches = pattern.finditer(text)
 
-        for pattern in self.promise_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
             for match in matches:
-                promise = match.group(1).strip()
+                promise = text[match.start(1):match.end(1)].strip()
                 if len(promise) > 20:
-                    promises.append(promise)
+                    key = promise.lower()
+                    if key not in seen:
+                        seen.add(key)
+                        promises.append(promise)
 
         return promises
 
 
+def _extract_one(
+        extractor: PoliticalContentExtractor,
+        html_file: Path,
+        has_meta: Optional[bool] = None
+) -> tuple[Optional[ExtractedContent], Optional[str]]:
+    """Извлечь контент одного файла. Возвращает (контент, текст ошибки)."""
+    try:
+        return extractor.extract_from_html_file(html_file, has_meta), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _analyze_one(
+        extractor: PoliticalContentExtractor,
+        html_file: Path,
+        has_meta: Optional[bool] = None
+) -> tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Проанализировать один файл. Возвращает (результат, текст ошибки).
+
+    Из процесса пула возвращается только сводка страницы и найденные
+    ключевые слова, а не весь извлеченный контент.
+    """
+    content, error = _extract_one(extractor, html_file, has_meta)
+    if content is None:
+        return None, error
+
+    return {
+        'page': {
+            'file': html_file.name,
+            'title': content.title,
+            'url': content.url,
+            'word_count': content.word_count,
+            'headings_count': sum(len(headings) for headings in content.headings.values()),
+            'links_count': len(content.internal_links) + len(content.external_links),
+            'keywords_found': len(content.political_keywords),
+            'quotes_found': len(content.quotes),
+            'promises_found': len(content.promises)
+        },
+        'keywords': content.political_keywords
+    }, None
+
+
 class ContentAnalyzer:
     """Анализатор извлеченного контента."""
 
-    def __init__(self, storage_manager: StorageManager):
+    def __init__(self, storage_manager: StorageManager, max_workers: Optional[int] = None):
         self.storage_manager = storage_manager
         self.extractor = PoliticalContentExtractor()
+        self.logger = logging.getLogger(__name__)
+        # Число процессов (потоков) для разбора файлов (None - по умолчанию пула, 1 - без пула)
+        self.max_workers = max_workers
+
+    def _map_files(
+            self,
+            func: Callable,
+            snapshot_path: Path,
+            html_files: List[Path],
+            executor_class: Type[Executor] = ProcessPoolExecutor
+    ) -> List[Any]:
+        """Применить func(extractor, html_file, has_meta) ко всем файлам с сохранением порядка."""
+        task = partial(func, self.extractor)
+
+        # Файлы метаданных перечисляем один раз вместо exists() на каждую страницу
+        meta_names = {p.name for p in snapshot_path.glob('*.html.meta.json')}
+        has_meta = [f"{html_file.name}.meta.json" in meta_names for html_file in html_files]
+
+        if self.max_workers == 1 or len(html_files) < 2:
+            return list(map(task, html_files, has_meta))
+
+        # Файлы независимы: разбор HTML и регулярки распределяются по ядрам
+        with executor_class(max_workers=self.max_workers) as executor:
+            return list(executor.map(task, html_files, has_meta, chunksize=8))
 
     def analyze_snapshot_folder(self, snapshot_path: Path) -> Dict[str, Any]:
         """Анализировать все HTML файлы в папке снапшота."""
@@ -327,46 +499,37 @@ class ContentAnalyzer:
             return {'error': 'No HTML files found'}
 
         extracted_pages = []
-        all_keywords = []
-        all_quotes = []
-        all_promises = []
+        # Ключевые слова сразу считаются, цитаты и обещания - только количество
+        keyword_counter = Counter()
+        total_keywords = 0
+        total_quotes = 0
+        total_promises = 0
         total_words = 0
 
-        for html_file in html_files:
-            try:
-                content = self.extractor.extract_from_html_file(html_file)
-
-                extracted_pages.append({
-                    'file': html_file.name,
-                    'title': content.title,
-                    'url': content.url,
-                    'word_count': content.word_count,
-                    'headings_count': sum(len(headings) for headings in content.headings.values()),
-                    'links_count': len(content.internal_links) + len(content.external_links),
-                    'keywords_found': len(content.political_keywords),
-                    'quotes_found': len(content.quotes),
-                    'promises_found': len(content.promises)
-                })
+        for html_file, (result, error) in zip(html_files, self._map_files(_analyze_one, snapshot_path, html_files)):
+            if result is None:
+                self.logger.error(f"❌ Ошибка при анализе {html_file}: {error}")
+                continue
 
-                all_keywords.extend(content.political_keywords)
-                all_quotes.extend(content.quotes)
-                all_promises.extend(content.promises)
-                total_words += content.word_count
+            page = result['page']
+            extracted_pages.append(page)
 
-            except Exception as e:
-                print(f"Ошибка при анализе {html_file}: {e}")
-                continue
+            keyword_counter.update(result['keywords'])
+            total_keywords += page['keywords_found']
+            total_quotes += page['quotes_found']
+            total_promises += page['promises_found']
+            total_words += page['word_count']
 
         # Создаем сводку
         analysis_summary = {
             'snapshot_path': str(snapshot_path),
             'total_pages': len(extracted_pages),
             'total_words': total_words,
-            'total_keywords': len(all_keywords),
-            'total_quotes': len(all_quotes),
-            'total_promises': len(all_promises),
+            'total_keywords': total_keywords,
+            'total_quotes': total_quotes,
+            'total_promises': total_promises,
             'pages': extracted_pages,
-            'top_keywords': self._get_top_items(all_keywords, 10),
+            'top_keywords': self._get_top_items(keyword_counter, 10),
             'analysis_date': datetime.now().isoformat()
         }
 
@@ -378,20 +541,21 @@ class ContentAnalyzer:
         html_files = list(snapshot_path.glob('*.html'))
         detailed_content = {}
 
-        for html_file in html_files:
-            try:
-                content = self.extractor.extract_from_html_file(html_file)
-                detailed_content[html_file.name] = content
-            except Exception as e:
-                print(f"Ошибка при извлечении контента из {html_file}: {e}")
+        # Полный ExtractedContent дорого передавать между процессами, поэтому
+        # здесь пул потоков: Lexbor разбирает HTML, отпустив GIL
+        results = self._map_files(_extract_one, snapshot_path, html_files, ThreadPoolExecutor)
+
+        for html_file, (content, error) in zip(html_files, results):
+            if content is None:
+                self.logger.error(f"❌ Ошибка при извлечении контента из {html_file}: {error}")
+                continue
+
+            detailed_content[html_file.name] = content
 
         return detailed_content
 
-    def _get_top_items(self, items: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+    def _get_top_items(self, counter: Counter, limit: int = 10) -> List[Dict[str, Any]]:
         """Получить топ самых частых элементов."""
-        from collections import Counter
-
-        counter = Counter(items)
         return [
             {'item': item, 'count': count}
             for item, count in counter.most_common(limit)
@@ -406,7 +570,7 @@ class ContentAnalyzer:
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(analysis_results, f, indent=2, ensure_ascii=False)
+        # orjson сразу пишет UTF-8 байты с тем же форматированием (отступ 2)
+        output_path.write_bytes(orjson.dumps(analysis_results, option=orjson.OPT_INDENT_2))
 
         return output_path
\ No newline at end of file
@@ -1,20 +1,40 @@
 """Улучшенный краулер для массового извлечения контента."""
 
+import asyncio
+import aiohttp
+import heapq
+import itertools
+import os
+import queue
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
-import json
+import re
+import orjson
 import time
-from bs4 import BeautifulSoup
-from typing import Set, List, Dict, Optional, Any
-from urllib.parse import urljoin, urlparse
+from selectolax.lexbor import LexborHTMLParser
+from typing import Set, List, Dict, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse, quote
 from pathlib import Path
 from datetime import datetime, timedelta
 
 from .storage_manager import StorageManager
+from ..utils.html_encoding import charset_from_content_type, decode_html
 from ..utils.rate_limiter import RateLimiter
 from ..utils.url_helper import ArchiveUrlHelper
 
 
+def _compile_substrings(substrings: List[str]) -> re.Pattern:
+    """Один regex, находящий любую из подстрок (замена any(s in text ...))."""
+    if not substrings:
+        # Пустая альтернатива совпала бы с любой строкой
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(map(re.escape, substrings)))
+
+
 class EnhancedSnapshotCrawler:
     """Улучшенный краулер для больших политических сайтов."""
 
@@ -24,7 +44,8 @@ class EnhancedSnapshotCrawler:
             rate_limiter: RateLimiter,
             max_depth: int = 4,
             max_pages: int = 500,
-            resume_mode: bool = True
+            resume_mode: bool = True,
+            collect_detailed_metrics: bool = True
     ):
         self.storage_manager = storage_manager
         self.rate_limiter = rate_limiter
@@ -32,11 +53,26 @@ class EnhancedSnapshotCrawler:
         self.max_pages = max_pages
         self.resume_mode = resume_mode
 
+        # Страницы больше этого размера не загружаются целиком и пропускаются
+        self.max_page_bytes = 10 * 1024 * 1024
+
+        # Подсчет ссылок и изображений в метаданных страницы (обход всех узлов);
+        # для страниц больше detailed_metrics_max_bytes он пропускается
+        self.collect_detailed_metrics = collect_detailed_metrics
+        self.detailed_metrics_max_bytes = 2 * 1024 * 1024
+
         self.visited_urls: Set[str] = set()
         self.found_pages: List[Dict] = []
         self.failed_urls: List[Dict] = []
         self.skipped_urls: List[str] = []
 
+        # Журнал обработанных страниц (JSONL), дописывается по ходу обхода
+        self._state_journal = None
+
+        # Фоновая запись страниц на диск (только на время синхронного обхода)
+        self._write_queue: Optional[queue.Queue] = None
+        self._writer_thread: Optional[threading.Thread] = None
+
         self.logger = logging.getLogger(__name__)
 
         # Расширенная статистика
@@ -45,6 +81,8 @@ class EnhancedSnapshotCrawler:
             'pages_processed': 0,
             'pages_skipped': 0,
             'pages_failed': 0,
+            'total_size_bytes': 0,
+            # Производные от total_size_bytes, считаются в конце обхода
             'total_size_mb': 0,
             'avg_page_size': 0
         }
@@ -54,6 +92,18 @@ class EnhancedSnapshotCrawler:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (compatible; UkrainePoliticalAnalyzer/1.0; +https://github.com/your/repo)'
         })
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
         # Приоритетные разделы для политических сайтов
         self.priority_paths = [
@@ -70,6 +120,10 @@ class EnhancedSnapshotCrawler:
             '.pdf', '.doc', '.zip', '.jpg', '.png', '.gif'
         ]
 
+        # Проверки путей компилируются один раз; ищем в URL в нижнем регистре
+        self._priority_re = _compile_substrings(self.priority_paths)
+        self._exclude_re = _compile_substrings(self.exclude_paths)
+
     def crawl_political_site(
             self,
             site_url: str,
@@ -85,6 +139,20 @@ class EnhancedSnapshotCrawler:
             callback: Функция для обновления прогресса
         """
 
+        archive_url, timestamp, target_domain = self._start_crawl(site_url, target_date)
+
+        # Начинаем рекурсивный обход
+        self._crawl_with_priority(archive_url, target_domain, callback)
+
+        return self._finish_crawl(site_url, archive_url, timestamp, target_domain)
+
+    def _start_crawl(self, site_url: str, target_date: str = None) -> tuple[str, str, str]:
+        """Найти снапшот и подготовить состояние к обходу.
+
+        Returns:
+            (архивный URL стартовой страницы, timestamp, целевой домен)
+        """
+
         self.logger.info(f"🚀 Начинаем обход политического сайта: {site_url}")
         self.stats['start_time'] = time.time()
 
@@ -109,13 +177,28 @@ class EnhancedSnapshotCrawler:
             self.found_pages.clear()
             self.failed_urls.clear()
 
-        # Начинаем рекурсивный обход
-        self._crawl_with_priority(archive_url, target_domain, callback)
+        self._open_state_journal(archive_url)
+
+        return archive_url, timestamp, target_domain
+
+    def _finish_crawl(
+            self,
+            site_url: str,
+            archive_url: str,
+            timestamp: str,
+            target_domain: str
+    ) -> Dict[str, Any]:
+        """Собрать итоговую сводку обхода и сохранить ее вместе с состоянием."""
 
         # Финальная статистика
         end_time = time.time()
         duration = end_time - self.stats['start_time']
 
+        total_bytes = self.stats['total_size_bytes']
+        self.stats['total_size_mb'] = total_bytes / (1024 * 1024)
+        if self.stats['pages_processed']:
+            self.stats['avg_page_size'] = total_bytes / self.stats['pages_processed']
+
         summary = {
             'start_url': archive_url,
             'original_url': site_url,
@@ -148,45 +231,43 @@ class EnhancedSnapshotCrawler:
         return summary
 
     def _find_best_snapshot(self, site_url: str, target_date: str = None) -> Optional[str]:
-        """Найти лучший доступный снапшот для сайта."""
+        """Найти лучший доступный снапшот для сайта.
+
+        Отбор по статусу 200 и поиск ближайшего к дате делает сам CDX сервер
+        (filter + sort=closest), поэтому загружается одна запись, а не весь
+        список снапшотов домена.
+        """
         from waybackpy import WaybackMachineCDXServerAPI
+        from waybackpy.exceptions import NoCDXRecordFound
 
         try:
-            cdx_api = WaybackMachineCDXServerAPI(site_url, self.session.headers['User-Agent'])
+            cdx_api = WaybackMachineCDXServerAPI(
+                site_url,
+                self.session.headers['User-Agent'],
+                filters=['statuscode:200'],
+                limit='1'
+            )
 
             if target_date:
-                # Ищем снапшоты рядом с целевой датой
+                # Ищем снапшот, ближайший к целевой дате
                 target_dt = datetime.strptime(target_date, '%Y-%m-%d')
 
-                # Ищем в окне ±30 дней
-                best_snapshot = None
-                min_diff = float('inf')
-
-                for snapshot in cdx_api.snapshots():
-                    try:
-                        snapshot_dt = datetime.strptime(snapshot.timestamp, "%Y%m%d%H%M%S")
-                        diff = abs((snapshot_dt - target_dt).days)
-
-                        if diff < min_diff and snapshot.statuscode == '200':
-                            min_diff = diff
-                            best_snapshot = snapshot
-
-                        # Если нашли точное совпадение по дню, берем его
-                        if diff == 0:
-                            break
+                try:
+                    best_snapshot = cdx_api.near(
+                        year=target_dt.year, month=target_dt.month, day=target_dt.day,
+                        hour=0, minute=0
+                    )
+                except NoCDXRecordFound:
+                    return None
 
-                    except (ValueError, AttributeError):
-                        continue
-
-                if best_snapshot:
-                    self.logger.info(f"📅 Найден снапшот на расстоянии {min_diff} дней от целевой даты")
-                    return best_snapshot.archive_url
+                min_diff = abs((best_snapshot.datetime_timestamp - target_dt).days)
+                self.logger.info(f"📅 Найден снапшот на расстоянии {min_diff} дней от целевой даты")
+                return best_snapshot.archive_url
 
             else:
-                # Берем последний доступный снапшот
+                # Берем первый доступный снапшот
                 for snapshot in cdx_api.snapshots():
-                    if snapshot.statuscode == '200':
-                        return snapshot.archive_url
+                    return snapshot.archive_url
 
             return None
 
@@ -195,47 +276,177 @@ class EnhancedSnapshotCrawler:
             return None
 
     def _crawl_with_priority(self, start_url: str, target_domain: str, callback=None):
-        """Обход с приоритизацией важных разделов."""
+        """Обход с приоритизацией важных разделов.
+
+        Вместо рекурсии используется очередь с приоритетом (heapq): первыми
+        идут главная страница и приоритетные разделы, затем найденные ссылки -
+        сначала меньшая глубина, внутри нее приоритетные разделы. Если обход
+        обрывается по max_pages, собраны самые важные страницы.
+        """
+
+        frontier = []
+        queued = set()
+        order = itertools.count()
 
-        # Сначала обходим приоритетные разделы
+        for url in self._start_urls(start_url):
+            queued.add(url)
+            heapq.heappush(frontier, (0, 0, next(order), url, 0))
+
+        self._start_writer()
+        try:
+            while frontier and len(self.found_pages) < self.max_pages:
+                *_, url, depth = heapq.heappop(frontier)
+
+                for link_url in self._crawl_url(url, target_domain, depth, callback):
+                    # Ссылка, уже стоящая в очереди, была найдена на той же или меньшей глубине
+                    if link_url not in queued:
+                        queued.add(link_url)
+                        heapq.heappush(
+                            frontier,
+                            (*self._frontier_priority(link_url, depth + 1), next(order), link_url, depth + 1)
+                        )
+        finally:
+            # Дожидаемся записи всех страниц до сохранения сводки
+            self._stop_writer()
+
+    def _frontier_priority(self, url: str, depth: int) -> Tuple[int, int]:
+        """Ключ очереди обхода: меньшая глубина раньше, затем приоритетные разделы."""
+        return depth, 0 if self._priority_re.search(url.lower()) else 1
+
+    def _start_urls(self, start_url: str) -> List[str]:
+        """Главная страница и архивные URL приоритетных разделов.
+
+        Разделы, которых нет в архиве, отбрасываются заранее одним запросом
+        к CDX, вместо пробного GET (и 404) на каждый из них.
+        """
         priority_urls = []
         timestamp, base_url = ArchiveUrlHelper.extract_timestamp_and_original(start_url)
 
-        for priority_path in self.priority_paths:
+        priority_paths = self.priority_paths
+        archived_paths = self._archived_priority_paths(base_url)
+        if archived_paths is not None:
+            priority_paths = [path for path in priority_paths if path in archived_paths]
+            self.logger.info(f"📂 Приоритетных разделов в архиве: {len(priority_paths)}/{len(self.priority_paths)}")
+
+        for priority_path in priority_paths:
             priority_url = ArchiveUrlHelper.build_archive_url(timestamp, base_url + priority_path)
             priority_urls.append(priority_url)
 
         # Добавляем главную страницу в начало
-        all_urls = [start_url] + priority_urls
+        return [start_url] + priority_urls
 
-        # Обходим приоритетные URL
-        for url in all_urls:
-            if len(self.found_pages) >= self.max_pages:
-                break
+    def _archived_priority_paths(self, base_url: str) -> Optional[Set[str]]:
+        """Найти приоритетные разделы, у которых есть снапшот со статусом 200.
 
-            if url not in self.visited_urls:
-                self._crawl_recursive(url, target_domain, depth=0, callback=callback)
+        Один запрос к CDX: фильтр по urlkey (SURT форма URL, которую CDX
+        хранит в нижнем регистре и с percent-encoding) сразу для всех путей.
+
+        Returns:
+            Множество путей из priority_paths или None, если CDX недоступен
+        """
+        from waybackpy import WaybackMachineCDXServerAPI
+
+        domain = ArchiveUrlHelper.get_domain(base_url)
+        if not domain or not self.priority_paths:
+            return None
 
-        # Если еще есть место, продолжаем обычный обход
-        if len(self.found_pages) < self.max_pages:
-            self._crawl_recursive(start_url, target_domain, depth=0, callback=callback)
+        host = domain[4:] if domain.startswith('www.') else domain
+        surt_host = ','.join(reversed(host.split('.'))) + ')'
+
+        # urlkey пути -> путь из priority_paths
+        paths_by_key = {quote(path.rstrip('/')).lower(): path for path in self.priority_paths}
+        keys_pattern = '|'.join(re.escape(key) for key in paths_by_key)
+
+        try:
+            cdx_api = WaybackMachineCDXServerAPI(
+                host + '/',
+                self.session.headers['User-Agent'],
+                match_type='prefix',
+                filters=['statuscode:200', f'urlkey:^{re.escape(surt_host)}({keys_pattern})/?$'],
+                collapses=['urlkey'],
+                limit='1000'
+            )
+
+            archived = set()
+            for snapshot in cdx_api.snapshots():
+                key = snapshot.urlkey.split(')', 1)[-1].rstrip('/')
+                if key in paths_by_key:
+                    archived.add(paths_by_key[key])
+            return archived
+
+        except Exception as e:
+            self.logger.warning(f"Не удалось проверить приоритетные разделы через CDX: {e}")
+            return None
+
+    def _crawl_url(self, archive_url: str, target_domain: str, depth: int, callback=None) -> List[str]:
+        """Загрузить и обработать одну страницу.
+
+        Returns:
+            Ссылки для дальнейшего обхода
+        """
+
+        if not self._begin_page(archive_url, depth, callback):
+            return []
+
+        try:
+            # Соблюдаем rate limiting (пропущенные страницы не тратят слот)
+            self.rate_limiter.wait_if_needed()
 
-    def _crawl_recursive(self, archive_url: str, target_domain: str, depth: int, callback=None):
-        """Рекурсивный обход с улучшенной обработкой ошибок."""
+            # Загружаем страницу потоком, не больше max_page_bytes
+            request_start = time.perf_counter()
+            with self.session.get(archive_url, stream=True, timeout=(5, 30)) as response:
+                if not self._check_status(archive_url, response.status_code, depth):
+                    return []
+
+                content = response.raw.read(self.max_page_bytes + 1, decode_content=True)
+                content_type = response.headers.get('Content-Type')
+            response_time_ms = (time.perf_counter() - request_start) * 1000
+
+            decoded = self._decode_body(archive_url, content, content_type)
+            if decoded is None:
+                return []
+            html, charset = decoded
+
+            # Обрабатываем успешную страницу
+            page_info, links = self._process_page(
+                archive_url, html, response_time_ms, target_domain, depth, len(content), charset
+            )
+            self._record_page(page_info)
+
+            # Ищем ссылки для дальнейшего обхода
+            if len(self.found_pages) < self.max_pages:
+                return links
+
+        except requests.RequestException as e:
+            self.logger.error(f"❌ Ошибка запроса для {archive_url}: {e}")
+            self._record_failure(archive_url, str(e), 'RequestException', depth)
+
+        except Exception as e:
+            self.logger.error(f"❌ Неожиданная ошибка для {archive_url}: {e}")
+            self._record_failure(archive_url, str(e), 'UnexpectedException', depth)
+
+        return []
+
+    def _begin_page(self, archive_url: str, depth: int, callback=None) -> bool:
+        """Проверить ограничения обхода и отметить URL посещенным.
+
+        Returns:
+            True, если страницу нужно загружать
+        """
 
         # Проверяем ограничения
         if (depth > self.max_depth or
                 len(self.found_pages) >= self.max_pages or
                 archive_url in self.visited_urls):
-            return
+            return False
 
         self.visited_urls.add(archive_url)
 
         # Проверяем исключаемые пути
-        if any(exclude in archive_url.lower() for exclude in self.exclude_paths):
+        if self._exclude_re.search(archive_url.lower()):
             self.skipped_urls.append(archive_url)
             self.logger.debug(f"⏭️ Пропущен (исключен): {archive_url}")
-            return
+            return False
 
         # Обновляем прогресс
         if callback:
@@ -243,77 +454,128 @@ class EnhancedSnapshotCrawler:
 
         self.logger.debug(f"🔍 Обрабатываем (глубина {depth}): {archive_url}")
 
-        try:
-            # Соблюдаем rate limiting
-            self.rate_limiter.wait_if_needed()
-
-            # Проверяем, не сохранена ли уже страница (resume)
-            if self.resume_mode and self.storage_manager.page_exists(archive_url):
-                self.logger.debug(f"✅ Страница уже существует: {archive_url}")
-                self.stats['pages_skipped'] += 1
-                return
-
-            # Загружаем страницу
-            response = self.session.get(archive_url, timeout=30)
+        # Проверяем, не сохранена ли уже страница (resume)
+        if self.resume_mode and self.storage_manager.page_exists(archive_url):
+            self.logger.debug(f"✅ Страница уже существует: {archive_url}")
+            self.stats['pages_skipped'] += 1
+            return False
 
-            if response.status_code == 404:
-                self.logger.debug(f"🚫 Страница не найдена в архиве: {archive_url}")
-                self.failed_urls.append({
-                    'url': archive_url,
-                    'error': 'Not found in archive',
-                    'status_code': 404,
-                    'depth': depth
-                })
-                return
+        return True
 
-            if response.status_code != 200:
-                self.logger.warning(f"⚠️ HTTP {response.status_code} для {archive_url}")
-                self.failed_urls.append({
-                    'url': archive_url,
-                    'error': f'HTTP {response.status_code}',
-                    'status_code': response.status_code,
-                    'depth': depth
-                })
-                return
-
-            # Обрабатываем успешную страницу
-            self._process_successful_page(archive_url, response, target_domain, depth)
-
-            # Ищем ссылки для дальнейшего обхода
-            if depth < self.max_depth and len(self.found_pages) < self.max_pages:
-                internal_links = self._extract_internal_links_optimized(
-                    response.text, archive_url, target_domain
-                )
-
-                # Рекурсивно обходим найденные ссылки
-                for link_url in internal_links:
-                    if len(self.found_pages) >= self.max_pages:
-                        break
-                    self._crawl_recursive(link_url, target_domain, depth + 1, callback)
-
-        except requests.RequestException as e:
-            self.logger.error(f"❌ Ошибка запроса для {archive_url}: {e}")
+    def _check_status(self, archive_url: str, status_code: int, depth: int) -> bool:
+        """Проверить HTTP статус ответа; неуспешный ответ учитывается в failed_urls."""
+        if status_code == 404:
+            self.logger.debug(f"🚫 Страница не найдена в архиве: {archive_url}")
             self.failed_urls.append({
                 'url': archive_url,
-                'error': str(e),
-                'error_type': 'RequestException',
+                'error': 'Not found in archive',
+                'status_code': 404,
                 'depth': depth
             })
+            return False
 
-        except Exception as e:
-            self.logger.error(f"❌ Неожиданная ошибка для {archive_url}: {e}")
+        if status_code != 200:
+            self.logger.warning(f"⚠️ HTTP {status_code} для {archive_url}")
             self.failed_urls.append({
                 'url': archive_url,
-                'error': str(e),
-                'error_type': 'UnexpectedException',
+                'error': f'HTTP {status_code}',
+                'status_code': status_code,
                 'depth': depth
             })
+            return False
 
-    def _process_successful_page(self, archive_url: str, response, target_domain: str, depth: int):
-        """Обработать успешно загруженную страницу."""
+        return True
 
-        # Парсим только для извлечения метаданных
-        soup = BeautifulSoup(response.text, 'html.parser')
+    def _decode_body(
+            self,
+            archive_url: str,
+            content: bytes,
+            content_type: Optional[str]
+    ) -> Optional[Tuple[str, str]]:
+        """Декодировать тело ответа по кодировке из Content-Type или самой страницы.
+
+        Returns:
+            (HTML, кодировка ответа) или None, если страница больше max_page_bytes
+        """
+        if len(content) > self.max_page_bytes:
+            self._skip_oversized_page(archive_url)
+            return None
+        return decode_html(content, charset_from_content_type(content_type))
+
+    def _record_failure(self, archive_url: str, error: str, error_type: str, depth: int):
+        """Учесть ошибку загрузки или обработки страницы в failed_urls."""
+        self.failed_urls.append({
+            'url': archive_url,
+            'error': error,
+            'error_type': error_type,
+            'depth': depth
+        })
+
+    def _process_page(
+            self,
+            archive_url: str,
+            html: str,
+            response_time_ms: float,
+            target_domain: str,
+            depth: int,
+            content_length: int,
+            charset: str
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Разобрать страницу, сохранить ее и найти ссылки для дальнейшего обхода.
+
+        На диск пишется декодированный HTML в UTF-8 (как его читают анализаторы),
+        исходная кодировка ответа сохраняется в метаданных (source_charset).
+
+        Общее состояние краулера не меняется (visited_urls только читается),
+        поэтому метод можно выполнять в пуле потоков. Учет страницы
+        в found_pages и статистике - _record_page, в вызывающем коде.
+
+        Returns:
+            (метаданные страницы, ссылки для дальнейшего обхода)
+        """
+        page_info, tree = self._parse_page(
+            archive_url, html, response_time_ms, depth, content_length, charset
+        )
+        self._save_page(archive_url, html, page_info)
+
+        links = []
+        if depth < self.max_depth:
+            links = self._extract_internal_links_optimized(tree, archive_url, target_domain)
+
+        return page_info, links
+
+    def _save_page(self, archive_url: str, content: str, page_info: Dict[str, Any]):
+        """Сохранить страницу: через фоновый поток записи, если он запущен, иначе сразу."""
+        if self._write_queue is not None:
+            # Запись на диск уходит в фоновый поток, обход сразу продолжается
+            # Поток записи получает копию: page_info остается в found_pages
+            page_info['saved_to'] = str(self.storage_manager.get_page_path(archive_url))
+            self._write_queue.put((archive_url, content, dict(page_info)))
+            return
+
+        # save_page_content дополняет метаданные - передаем копию
+        file_path = self.storage_manager.save_page_content(
+            archive_url=archive_url,
+            content=content,
+            metadata=dict(page_info)
+        )
+        page_info['saved_to'] = str(file_path)
+
+    def _parse_page(
+            self,
+            archive_url: str,
+            html: str,
+            response_time_ms: float,
+            depth: int,
+            content_length: int,
+            charset: str
+    ) -> Tuple[Dict[str, Any], LexborHTMLParser]:
+        """Разобрать страницу и собрать ее метаданные.
+
+        content_length - размер тела ответа в байтах, charset - его кодировка.
+        """
+
+        tree = LexborHTMLParser(html)
 
         # Извлекаем базовую информацию
         timestamp, original_url = ArchiveUrlHelper.extract_timestamp_and_original(archive_url)
@@ -323,33 +585,32 @@ class EnhancedSnapshotCrawler:
             'archive_url': archive_url,
             'original_url': original_url,
             'timestamp': timestamp,
-            'title': self._extract_title_safe(soup),
-            'content_length': len(response.text),
-            'content_length_mb': round(len(response.text) / (1024 * 1024), 3),
+            'title': self._extract_title_safe(tree),
+            'content_length': content_length,
+            'content_length_mb': round(content_length / (1024 * 1024), 3),
+            'source_charset': charset,
             'depth': depth,
-            'links_found': len(soup.find_all('a', href=True)),
-            'images_found': len(soup.find_all('img')),
             'processed_at': time.time(),
-            'response_time_ms': round(response.elapsed.total_seconds() * 1000, 2)
+            'response_time_ms': round(response_time_ms, 2)
         }
 
-        # Обновляем статистику
-        self.stats['pages_processed'] += 1
-        self.stats['total_size_mb'] += page_info['content_length_mb']
-        self.stats['avg_page_size'] = (
-                (self.stats['avg_page_size'] * (self.stats['pages_processed'] - 1) +
-                 len(response.text)) / self.stats['pages_processed']
-        )
+        if self.collect_detailed_metrics and content_length <= self.detailed_metrics_max_bytes:
+            page_info['links_found'] = len(tree.css('a[href]'))
+            page_info['images_found'] = len(tree.css('img'))
 
-        # Сохраняем контент
-        file_path = self.storage_manager.save_page_content(
-            archive_url=archive_url,
-            content=response.text,
-            metadata=page_info
-        )
+        return page_info, tree
+
+    def _record_page(self, page_info: Dict[str, Any]):
+        """Учесть обработанную страницу в статистике, found_pages и журнале."""
+
+        # Точная целочисленная сумма; средний размер и MB - в _finish_crawl
+        self.stats['pages_processed'] += 1
+        self.stats['total_size_bytes'] += page_info['content_length']
 
-        page_info['saved_to'] = str(file_path)
         self.found_pages.append(page_info)
+        if self._write_queue is None:
+            # Страница уже сохранена; иначе журнал пишет поток записи после сохранения
+            self._append_state_journal(page_info)
 
         self.logger.info(
             f"✅ [{len(self.found_pages)}/{self.max_pages}] "
@@ -357,15 +618,68 @@ class EnhancedSnapshotCrawler:
             f"({page_info['content_length_mb']} MB)"
         )
 
-    def _extract_title_safe(self, soup: BeautifulSoup) -> str:
+    def _start_writer(self):
+        """Запустить фоновый поток записи страниц на диск."""
+        # Ограниченная очередь: если диск не успевает, обход притормаживает
+        self._write_queue = queue.Queue(maxsize=64)
+        self._writer_thread = threading.Thread(
+            target=self._drain_writes, args=(self._write_queue,), name='page-writer', daemon=True
+        )
+        self._writer_thread.start()
+
+    def _stop_writer(self):
+        """Дождаться записи всех страниц из очереди и остановить поток."""
+        if self._writer_thread is None:
+            return
+        self._write_queue.put(None)
+        self._writer_thread.join()
+        self._write_queue = None
+        self._writer_thread = None
+
+    def _drain_writes(self, write_queue: queue.Queue):
+        """Цикл фонового потока: сохранять страницы из очереди до получения None."""
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+
+            archive_url, content, page_info = item
+            try:
+                self.storage_manager.save_page_content(
+                    archive_url=archive_url,
+                    content=content,
+                    metadata=dict(page_info)
+                )
+            except Exception as e:
+                self.logger.error(f"❌ Ошибка записи страницы {archive_url}: {e}")
+                self.failed_urls.append({
+                    'url': archive_url,
+                    'error': str(e),
+                    'error_type': 'WriteError',
+                    'depth': page_info['depth']
+                })
+                continue
+
+            # В журнал попадают только страницы, уже лежащие на диске
+            self._append_state_journal(page_info)
+
+    def _skip_oversized_page(self, archive_url: str):
+        """Пропустить страницу, превышающую max_page_bytes."""
+        self.skipped_urls.append(archive_url)
+        self.logger.warning(
+            f"⏭️ Пропущен (больше {self.max_page_bytes // (1024 * 1024)} MB): {archive_url}"
+        )
+
+    def _extract_title_safe(self, tree: LexborHTMLParser) -> str:
         """Безопасно извлечь заголовок страницы."""
         try:
-            if soup.title and soup.title.string:
-                return soup.title.string.strip()
+            title_tag = tree.css_first('title')
+            if title_tag and title_tag.text().strip():
+                return title_tag.text().strip()
 
-            h1_tag = soup.find('h1')
-            if h1_tag and h1_tag.get_text():
-                return h1_tag.get_text().strip()
+            h1_tag = tree.css_first('h1')
+            if h1_tag and h1_tag.text():
+                return h1_tag.text().strip()
 
             return "Без заголовка"
         except:
@@ -373,27 +687,36 @@ class EnhancedSnapshotCrawler:
 
     def _extract_internal_links_optimized(
             self,
-            html_content: str,
+            tree: LexborHTMLParser,
             base_archive_url: str,
             target_domain: str
     ) -> List[str]:
-        """Оптимизированное извлечение внутренних ссылок."""
+        """Оптимизированное извлечение внутренних ссылок из уже разобранной страницы."""
 
         try:
-            # Парсим только для ссылок
-            soup = BeautifulSoup(html_content, 'html.parser')
             timestamp, _ = ArchiveUrlHelper.extract_timestamp_and_original(base_archive_url)
 
-            internal_links = []
-            links = soup.find_all('a', href=True)
+            # Приоритетные разделы идут первыми, порядок на странице сохраняется
+            priority_links = []
+            regular_links = []
+            seen_links = set()
+            seen_hrefs = set()
+            links = tree.css('a[href]')
 
             for link in links:
-                href = link['href'].strip()
+                href = (link.attributes.get('href') or '').strip()
                 if not href or href.startswith('#'):
                     continue
 
+                # Меню и футер повторяют одни и те же ссылки - проверяем их один раз
+                if href in seen_hrefs:
+                    continue
+                seen_hrefs.add(href)
+
+                href_lower = href.lower()
+
                 # Быстрая проверка на исключаемые пути
-                if any(exclude in href.lower() for exclude in self.exclude_paths):
+                if self._exclude_re.search(href_lower):
                     continue
 
                 archive_link = None
@@ -403,32 +726,25 @@ class EnhancedSnapshotCrawler:
                     archive_link = ArchiveUrlHelper.convert_relative_to_archive(href, base_archive_url)
 
                 # Абсолютная ссылка того же домена
-                elif target_domain in href.lower():
+                elif target_domain in href_lower:
                     if ArchiveUrlHelper.is_archive_url(href):
                         archive_link = href
                     else:
                         archive_link = ArchiveUrlHelper.build_archive_url(timestamp, href)
 
+                # Разные href могут дать один архивный URL
+                if not archive_link or archive_link in seen_links:
+                    continue
+
                 # Добавляем валидную ссылку
-                if (archive_link and
-                        archive_link not in self.visited_urls and
+                if (archive_link not in self.visited_urls and
                         ArchiveUrlHelper.is_same_domain(archive_link, base_archive_url)):
 
-                    internal_links.append(archive_link)
-
-            # Удаляем дубликаты и сортируем по приоритету
-            unique_links = list(set(internal_links))
-
-            # Приоритизируем важные разделы
-            priority_links = []
-            regular_links = []
-
-            for link in unique_links:
-                is_priority = any(priority in link.lower() for priority in self.priority_paths)
-                if is_priority:
-                    priority_links.append(link)
-                else:
-                    regular_links.append(link)
+                    seen_links.add(archive_link)
+                    if self._priority_re.search(archive_link.lower()):
+                        priority_links.append(archive_link)
+                    else:
+                        regular_links.append(archive_link)
 
             return priority_links + regular_links
 
@@ -443,13 +759,30 @@ class EnhancedSnapshotCrawler:
             state_file = snapshot_path / 'crawler_state.json'
 
             if state_file.exists():
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    state = json.load(f)
+                state = orjson.loads(state_file.read_bytes())
 
                 self.visited_urls = set(state.get('visited_urls', []))
                 self.found_pages = state.get('found_pages', [])
                 self.failed_urls = state.get('failed_urls', [])
 
+            # Страницы, обработанные после последнего полного сохранения
+            # (обход был прерван), восстанавливаем из журнала
+            journal_file = snapshot_path / 'crawler_state.jsonl'
+            if journal_file.exists():
+                known_pages = {page['archive_url'] for page in self.found_pages}
+                with open(journal_file, 'rb') as f:
+                    for line in f:
+                        try:
+                            page_info = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            # Последняя строка могла быть записана не полностью
+                            continue
+                        if page_info['archive_url'] not in known_pages:
+                            known_pages.add(page_info['archive_url'])
+                            self.found_pages.append(page_info)
+                            self.visited_urls.add(page_info['archive_url'])
+
+            if self.visited_urls:
                 self.logger.info(f"🔄 Восстановлено состояние: {len(self.visited_urls)} посещенных URL")
 
         except Exception as e:
@@ -461,16 +794,250 @@ class EnhancedSnapshotCrawler:
             snapshot_path = self.storage_manager.get_snapshot_path(archive_url)
             state_file = snapshot_path / 'crawler_state.json'
 
+            # Страницы уже есть в found_pages, в сводке их не дублируем
             state = {
                 'visited_urls': list(self.visited_urls),
                 'found_pages': self.found_pages,
                 'failed_urls': self.failed_urls,
-                'summary': summary,
+                'summary': {key: value for key, value in summary.items() if key != 'pages'},
                 'saved_at': datetime.now().isoformat()
             }
 
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2, ensure_ascii=False)
+            state_file.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+
+            # Полное состояние сохранено - журнал больше не нужен
+            self._close_state_journal(truncate=True)
+
+        except Exception as e:
+            self.logger.warning(f"Не удалось сохранить состояние: {e}")
+        finally:
+            self._close_state_journal()
+
+    def _open_state_journal(self, archive_url: str):
+        """Открыть журнал страниц для дозаписи, чтобы прерванный обход можно было продолжить."""
+        self._close_state_journal()
+        try:
+            snapshot_path = self.storage_manager.get_snapshot_path(archive_url)
+            snapshot_path.mkdir(parents=True, exist_ok=True)
+            # Без resume старый журнал не нужен - начинаем его заново
+            mode = 'ab' if self.resume_mode else 'wb'
+            self._state_journal = open(snapshot_path / 'crawler_state.jsonl', mode)
+        except Exception as e:
+            self.logger.warning(f"Не удалось открыть журнал состояния: {e}")
+
+    def _append_state_journal(self, page_info: Dict[str, Any]):
+        """Дописать обработанную страницу в журнал одной строкой JSON."""
+        if self._state_journal is None:
+            return
+        try:
+            self._state_journal.write(orjson.dumps(page_info) + b'\n')
+            self._state_journal.flush()
+        except Exception as e:
+            self.logger.warning(f"Не удалось записать журнал состояния: {e}")
+
+    def _close_state_journal(self, truncate: bool = False):
+        """Закрыть журнал; truncate=True очищает его после полного сохранения."""
+        if self._state_journal is None:
+            return
+        if truncate:
+            self._state_journal.truncate(0)
+        self._state_journal.close()
+        self._state_journal = None
+
+
+class AsyncEnhancedSnapshotCrawler(EnhancedSnapshotCrawler):
+    """Асинхронный вариант краулера: несколько страниц загружаются одновременно.
+
+    Обход идет через общую очередь с приоритетом (как в _crawl_with_priority),
+    которую разбирают max_concurrent корутин на одной aiohttp сессии. Ограничения, resume режим,
+    обработка страниц и итоговая сводка - как у EnhancedSnapshotCrawler.
+    """
+
+    def __init__(
+            self,
+            storage_manager: StorageManager,
+            rate_limiter: RateLimiter,
+            max_depth: int = 4,
+            max_pages: int = 500,
+            resume_mode: bool = True,
+            max_concurrent: int = 10,
+            collect_detailed_metrics: bool = True
+    ):
+        super().__init__(
+            storage_manager, rate_limiter, max_depth, max_pages, resume_mode, collect_detailed_metrics
+        )
+        self.max_concurrent = max_concurrent
+
+        # URL, уже поставленные в очередь обхода, и счетчик для стабильного порядка
+        self._queued: Set[str] = set()
+        self._queue_order = itertools.count()
+
+        # Пул потоков для разбора и сохранения страниц (создается на время обхода)
+        self.parse_workers = min(max_concurrent, os.cpu_count() or 1)
+        self._parse_pool: Optional[ThreadPoolExecutor] = None
+        self._pages_in_progress = 0
+
+    async def crawl_political_site(
+            self,
+            site_url: str,
+            target_date: str = None,
+            callback=None
+    ) -> Dict[str, Any]:
+        """
+        Полный обход политического сайта с параллельной загрузкой страниц.
+
+        Args:
+            site_url: URL сайта (например, https://sluga-narodu.com)
+            target_date: Целевая дата в формате YYYY-MM-DD (опционально)
+            callback: Функция для обновления прогресса
+        """
+
+        # Поиск снапшота через CDX синхронный - выполняем его в отдельном потоке
+        archive_url, timestamp, target_domain = await asyncio.to_thread(
+            self._start_crawl, site_url, target_date
+        )
+
+        await self._crawl_concurrently(archive_url, target_domain, callback)
+
+        return self._finish_crawl(site_url, archive_url, timestamp, target_domain)
+
+    async def _crawl_concurrently(self, start_url: str, target_domain: str, callback=None):
+        """Обход сайта пулом корутин, разбирающих общую очередь."""
+
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._queued = set()
+        self._queue_order = itertools.count()
+
+        # Сначала главная страница и приоритетные разделы (запрос к CDX - в потоке)
+        for url in await asyncio.to_thread(self._start_urls, start_url):
+            self._queued.add(url)
+            queue.put_nowait((0, 0, next(self._queue_order), url, 0))
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent * 2,
+            limit_per_host=self.max_concurrent,
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(total=30)
+
+        self._parse_pool = ThreadPoolExecutor(max_workers=self.parse_workers)
+        try:
+            async with aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=timeout,
+                    headers=dict(self.session.headers)
+            ) as session:
+
+                workers = [
+                    asyncio.create_task(self._crawl_worker(session, queue, target_domain, callback))
+                    for _ in range(self.max_concurrent)
+                ]
+
+                # Ждем, пока не будут обработаны все URL, включая найденные по ходу
+                await queue.join()
+
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+
+    async def _crawl_worker(
+            self,
+            session: aiohttp.ClientSession,
+            queue: asyncio.PriorityQueue,
+            target_domain: str,
+            callback=None
+    ):
+        """Корутина-обработчик: берет URL из очереди и добавляет найденные ссылки."""
+        while True:
+            *_, archive_url, depth = await queue.get()
+            try:
+                for link_url in await self._crawl_page(session, archive_url, target_domain, depth, callback):
+                    if link_url not in self._queued:
+                        self._queued.add(link_url)
+                        queue.put_nowait(
+                            (*self._frontier_priority(link_url, depth + 1), next(self._queue_order),
+                             link_url, depth + 1)
+                        )
+            finally:
+                queue.task_done()
+
+    async def _crawl_page(
+            self,
+            session: aiohttp.ClientSession,
+            archive_url: str,
+            target_domain: str,
+            depth: int,
+            callback=None
+    ) -> List[str]:
+        """Загрузить и обработать одну страницу.
+
+        Проверки, декодирование, разбор, сохранение и поиск ссылок - общие
+        с синхронным обходом, здесь только загрузка через aiohttp.
+
+        Returns:
+            Ссылки для дальнейшего обхода
+        """
+
+        # Между проверкой и добавлением в visited_urls нет await,
+        # поэтому в одном event loop блокировка не нужна
+        if not self._begin_page(archive_url, depth, callback):
+            return []
+
+        try:
+            # Соблюдаем rate limiting (пропущенные страницы не тратят слот)
+            await self.rate_limiter.acquire()
+
+            # Загружаем страницу, не больше max_page_bytes
+            request_start = time.perf_counter()
+            async with session.get(archive_url) as response:
+                if not self._check_status(archive_url, response.status, depth):
+                    return []
+
+                content = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    content += chunk
+                    if len(content) > self.max_page_bytes:
+                        break
+
+                content_type = response.headers.get('Content-Type')
+            response_time_ms = (time.perf_counter() - request_start) * 1000
+
+            content = bytes(content)
+            decoded = self._decode_body(archive_url, content, content_type)
+            if decoded is None:
+                return []
+            html, charset = decoded
+
+            # Пока страница загружалась, лимит мог быть набран другими корутинами
+            if len(self.found_pages) + self._pages_in_progress >= self.max_pages:
+                return []
+
+            # Разбор, сохранение и поиск ссылок идут в пуле потоков, а event loop
+            # тем временем продолжает загрузку других страниц (Lexbor отпускает GIL)
+            self._pages_in_progress += 1
+            try:
+                page_info, links = await asyncio.get_running_loop().run_in_executor(
+                    self._parse_pool, self._process_page,
+                    archive_url, html, response_time_ms, target_domain, depth, len(content), charset
+                )
+            finally:
+                self._pages_in_progress -= 1
+
+            # Общее состояние меняется только в event loop
+            self._record_page(page_info)
+
+            if len(self.found_pages) < self.max_pages:
+                return links
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"❌ Ошибка запроса для {archive_url}: {e!r}")
+            self._record_failure(archive_url, str(e) or type(e).__name__, 'RequestException', depth)
 
         except Exception as e:
-            self.logger.warning(f"Не удалось сохранить состояние: {e}")
\ No newline at end of file
+            self.logger.error(f"❌ Неожиданная ошибка для {archive_url}: {e}")
+            self._record_failure(archive_url, str(e), 'UnexpectedException', depth)
+
+        return []
@@ -1,11 +1,21 @@
 # src/wayback_analyzer/core/site_crawler.py
+import asyncio
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 from urllib.parse import urljoin, urlparse
-from typing import Set, List, Dict
+from typing import Set, List, Dict, Tuple
+import re
 import time
+from collections import deque
+from ..utils.html_encoding import charset_from_content_type, decode_html
 from ..utils.rate_limiter import RateLimiter
 
+# https://web.archive.org/web/20220224120000/https://example.com
+_ARCHIVE_RE = re.compile(r'^(https?://web\.archive\.org/web/(\d{14}))/(.+)$')
+
 class ArchiveSiteCrawler:
     def __init__(self, rate_limiter: RateLimiter, max_depth: int = 3):
         self.rate_limiter = rate_limiter
@@ -13,17 +23,59 @@ class ArchiveSiteCrawler:
         self.visited_urls: Set[str] = set()
         self.found_pages: List[Dict] = []
 
+        # Одна session с пулом соединений: keep-alive вместо нового
+        # TCP+TLS соединения с web.archive.org на каждую страницу
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (compatible; WaybackAnalyzer/1.0)'
+        })
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Закрыть session и ее пул соединений (после обхода всех снапшотов)."""
+        self.session.close()
+
     def discover_site_structure(self, archive_url: str, base_domain: str) -> List[Dict]:
-        """Рекурсивно обнаружить все страницы сайта в архиве."""
+        """Рекурсивно обнаружить все страницы сайта в архиве.
+
+        Session не закрывается: keep-alive соединения переиспользуются
+        следующими вызовами, закрывает их close().
+        """
 
-        self._crawl_recursive(archive_url, base_domain, depth=0)
+        self._crawl(archive_url, base_domain)
         return self.found_pages
 
-    def _crawl_recursive(self, archive_url: str, base_domain: str, depth: int):
-        """Рекурсивный обход архивной версии сайта."""
+    def _crawl(self, start_url: str, base_domain: str):
+        """Обход архивной версии сайта в ширину через явную очередь (без рекурсии)."""
+
+        queue = deque([(start_url, 0)])
+        while queue:
+            archive_url, depth = queue.popleft()
+            for link_url in self._crawl_page(archive_url, base_domain, depth):
+                queue.append((link_url, depth + 1))
+
+    def _crawl_page(self, archive_url: str, base_domain: str, depth: int) -> List[str]:
+        """Обработать одну страницу архива и вернуть найденные на ней ссылки."""
 
         if depth > self.max_depth or archive_url in self.visited_urls:
-            return
+            return []
 
         self.visited_urls.add(archive_url)
 
@@ -31,72 +83,173 @@ class ArchiveSiteCrawler:
             # Соблюдаем rate limiting
             self.rate_limiter.wait_if_needed()
 
-            response = requests.get(archive_url, timeout=30)
+            response = self.session.get(archive_url, timeout=(5, 30))
             if response.status_code != 200:
-                return
-
-            # Парсим HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Извлекаем оригинальный URL из архивной ссылки
-            original_url = self._extract_original_url(archive_url)
-
-            # Сохраняем информацию о странице
-            page_info = {
-                'archive_url': archive_url,
-                'original_url': original_url,
-                'title': soup.title.string if soup.title else '',
-                'content_length': len(response.content),
-                'depth': depth,
-                'timestamp': self._extract_timestamp(archive_url)
-            }
-            self.found_pages.append(page_info)
-
-            # Находим все ссылки на другие страницы того же домена
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link['href']
-
-                # Преобразуем относительные ссылки в абсолютные архивные
-                if href.startswith('/'):
-                    # Это относительная ссылка
-                    archive_base = self._get_archive_base(archive_url)
-                    full_archive_url = archive_base + href
-                elif base_domain in href and 'web.archive.org' in href:
-                    # Это уже архивная ссылка
-                    full_archive_url = href
-                elif base_domain in href:
-                    # Обычная ссылка, нужно превратить в архивную
-                    timestamp = self._extract_timestamp(archive_url)
-                    full_archive_url = f"https://web.archive.org/web/{timestamp}/{href}"
-                else:
-                    continue  # Внешняя ссылка, пропускаем
-
-                # Рекурсивно обходим найденные страницы
-                self._crawl_recursive(full_archive_url, base_domain, depth + 1)
+                return []
+
+            # Lexbor разбирает bytes только как UTF-8, поэтому передаем текст,
+            # декодированный по кодировке ответа или объявленной в странице
+            html, _ = decode_html(
+                response.content, charset_from_content_type(response.headers.get('Content-Type'))
+            )
+            return self._process_page(archive_url, html, len(response.content), base_domain, depth)
 
         except Exception as e:
             print(f"Ошибка при обходе {archive_url}: {e}")
+            return []
+
+    def _process_page(
+            self,
+            archive_url: str,
+            html: str,
+            content_length: int,
+            base_domain: str,
+            depth: int
+    ) -> List[str]:
+        """Разобрать загруженную страницу, учесть ее в found_pages и найти ссылки.
+
+        Общий для синхронного и асинхронного обхода.
+        """
+
+        # Парсим HTML
+        tree = LexborHTMLParser(html)
+        title_tag = tree.css_first('title')
+
+        # Извлекаем timestamp, оригинальный URL и базу из архивной ссылки
+        timestamp, original_url, archive_base = self._parse_archive_url(archive_url)
+
+        # Сохраняем информацию о странице
+        page_info = {
+            'archive_url': archive_url,
+            'original_url': original_url,
+            'title': title_tag.text() if title_tag else '',
+            'content_length': content_length,
+            'depth': depth,
+            'timestamp': timestamp
+        }
+        self.found_pages.append(page_info)
+
+        # Находим все ссылки на другие страницы того же домена
+        found_links = []
+        links = tree.css('a[href]')
+        for link in links:
+            href = link.attributes.get('href') or ''
+
+            # Преобразуем относительные ссылки в абсолютные архивные
+            if href.startswith('/'):
+                # Это относительная ссылка
+                full_archive_url = archive_base + href
+            elif base_domain in href and 'web.archive.org' in href:
+                # Это уже архивная ссылка
+                full_archive_url = href
+            elif base_domain in href:
+                # Обычная ссылка, нужно превратить в архивную
+                full_archive_url = f"https://web.archive.org/web/{timestamp}/{href}"
+            else:
+                continue  # Внешняя ссылка, пропускаем
+
+            found_links.append(full_archive_url)
+
+        return found_links
+
+    def _parse_archive_url(self, archive_url: str) -> Tuple[str, str, str]:
+        """Разобрать архивную ссылку одним regex.
+
+        Returns:
+            (timestamp, оригинальный URL, база архива), например для
+            https://web.archive.org/web/20220224120000/https://example.com -
+            ('20220224120000', 'https://example.com', 'https://web.archive.org/web/20220224120000').
+            Для не архивной ссылки - ('', archive_url, '')
+        """
+        match = _ARCHIVE_RE.match(archive_url)
+        if match:
+            return match.group(2), match.group(3), match.group(1)
+        return '', archive_url, ''
+
+
+class AsyncArchiveSiteCrawler(ArchiveSiteCrawler):
+    """Асинхронный вариант краулера: несколько страниц загружаются одновременно.
+
+    Обход в ширину через общую очередь (url, глубина), которую разбирают
+    max_concurrent корутин на одной aiohttp сессии. Все корутины работают
+    в одном event loop, поэтому visited_urls и found_pages не требуют блокировок.
+    Разбор страниц - как у ArchiveSiteCrawler.
+    """
+
+    def __init__(self, rate_limiter: RateLimiter, max_depth: int = 3, max_concurrent: int = 5):
+        super().__init__(rate_limiter, max_depth)
+        self.max_concurrent = max_concurrent
+
+    async def discover_site_structure(self, archive_url: str, base_domain: str) -> List[Dict]:
+        """Обнаружить все страницы сайта в архиве с параллельной загрузкой."""
+
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait((archive_url, 0))
+
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrent, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=30)
+
+        async with aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers=dict(self.session.headers)
+        ) as session:
+
+            workers = [
+                asyncio.create_task(self._crawl_worker(session, queue, base_domain))
+                for _ in range(self.max_concurrent)
+            ]
+
+            # Ждем, пока не будут обработаны все URL, включая найденные по ходу
+            await queue.join()
+
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-    def _extract_original_url(self, archive_url: str) -> str:
-        """Извлечь оригинальный URL из архивной ссылки."""
-        # web.archive.org/web/20220224120000/https://example.com
-        parts = archive_url.split('/')
-        if len(parts) >= 6 and 'web.archive.org' in archive_url:
-            return '/'.join(parts[6:])
-        return archive_url
-
-    def _extract_timestamp(self, archive_url: str) -> str:
-        """Извлечь timestamp из архивной ссылки."""
-        parts = archive_url.split('/')
-        if len(parts) >= 5 and 'web.archive.org' in archive_url:
-            return parts[5]
-        return ''
-
-    def _get_archive_base(self, archive_url: str) -> str:
-        """Получить базовую часть архивной ссылки."""
-        # Возвращает https://web.archive.org/web/20220224120000
-        parts = archive_url.split('/')
-        if len(parts) >= 6:
-            return '/'.join(parts[:6])
-        return ''
\ No newline at end of file
+        return self.found_pages
+
+    async def _crawl_worker(self, session: aiohttp.ClientSession, queue: asyncio.Queue, base_domain: str):
+        """Корутина-обработчик: берет URL из очереди и добавляет найденные ссылки."""
+        while True:
+            archive_url, depth = await queue.get()
+            try:
+                for link_url in await self._crawl_page(session, archive_url, base_domain, depth):
+                    queue.put_nowait((link_url, depth + 1))
+            finally:
+                queue.task_done()
+
+    async def _crawl_page(
+            self,
+            session: aiohttp.ClientSession,
+            archive_url: str,
+            base_domain: str,
+            depth: int
+    ) -> List[str]:
+        """Загрузить одну страницу архива и вернуть найденные на ней ссылки."""
+
+        # Между проверкой и добавлением в visited_urls нет await,
+        # поэтому в одном event loop блокировка не нужна
+        if depth > self.max_depth or archive_url in self.visited_urls:
+            return []
+
+        self.visited_urls.add(archive_url)
+
+        try:
+            # Соблюдаем rate limiting
+            await self.rate_limiter.acquire()
+
+            async with session.get(archive_url) as response:
+                if response.status != 200:
+                    return []
+
+                content = await response.read()
+                content_type = response.headers.get('Content-Type')
+
+            html, _ = decode_html(content, charset_from_content_type(content_type))
+
+            return self._process_page(archive_url, html, len(content), base_domain, depth)
+
+        except Exception as e:
+            print(f"Ошибка при обходе {archive_url}: {e}")
+            return []
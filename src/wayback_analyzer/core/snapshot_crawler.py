@@ -1,19 +1,28 @@
 """Краулер для извлечения всего контента архивного снапшота."""
 
+import asyncio
+import aiohttp
 import requests
 import logging
-from bs4 import BeautifulSoup
-from typing import Set, List, Dict, Optional
+import os
+from typing import Set, List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from selectolax.lexbor import LexborHTMLParser
 
 from .storage_manager import StorageManager
+from ..utils.html_encoding import charset_from_content_type, decode_html
 from ..utils.rate_limiter import RateLimiter
 from ..utils.url_helper import ArchiveUrlHelper
 
+# Селектор для единственного прохода по ссылкам и изображениям страницы
+_LINKS_AND_IMAGES_SELECTOR = 'a[href], img[src]'
+
 
 class SnapshotCrawler:
-    """Краулер для рекурсивного обхода архивного снапшота сайта."""
+    """Краулер для обхода архивного снапшота сайта в ширину."""
 
     def __init__(
             self,
@@ -56,6 +65,18 @@ class SnapshotCrawler:
         Returns:
             Словарь с результатами обхода
         """
+        target_domain = self._start_crawl(start_archive_url)
+
+        # Начинаем обход в ширину
+        start_time = time.time()
+        self._crawl(start_archive_url, target_domain)
+        end_time = time.time()
+
+        return self._finish_crawl(start_archive_url, target_domain, end_time - start_time)
+
+    def _start_crawl(self, start_archive_url: str) -> str:
+        """Определить целевой домен и сбросить состояние перед обходом."""
+
         self.logger.info(f"Начинаем обход снапшота: {start_archive_url}")
 
         # Получаем базовый домен
@@ -70,10 +91,10 @@ class SnapshotCrawler:
         self.found_pages.clear()
         self.failed_urls.clear()
 
-        # Начинаем рекурсивный обход
-        start_time = time.time()
-        self._crawl_recursive(start_archive_url, target_domain, depth=0)
-        end_time = time.time()
+        return target_domain
+
+    def _finish_crawl(self, start_archive_url: str, target_domain: str, duration: float) -> Dict:
+        """Создать и сохранить сводку обхода."""
 
         # Создаем сводку
         summary = {
@@ -81,7 +102,7 @@ class SnapshotCrawler:
             'target_domain': target_domain,
             'total_pages_found': len(self.found_pages),
             'total_pages_failed': len(self.failed_urls),
-            'crawl_duration_seconds': round(end_time - start_time, 2),
+            'crawl_duration_seconds': round(duration, 2),
             'max_depth_reached': max((page.get('depth', 0) for page in self.found_pages), default=0),
             'pages': self.found_pages,
             'failed_urls': self.failed_urls
@@ -94,26 +115,41 @@ class SnapshotCrawler:
 
         return summary
 
-    def _crawl_recursive(self, archive_url: str, target_domain: str, depth: int):
-        """Рекурсивный обход страниц."""
+    def _crawl(self, start_archive_url: str, target_domain: str):
+        """Обход снапшота в ширину через явную очередь (без рекурсии)."""
+
+        queue = deque([(start_archive_url, 0)])
+        while queue and len(self.found_pages) < self.max_pages:
+            archive_url, depth = queue.popleft()
+            for link_url in self._crawl_page(archive_url, target_domain, depth):
+                if depth + 1 <= self.max_depth:
+                    queue.append((link_url, depth + 1))
+
+    def _crawl_page(self, archive_url: str, target_domain: str, depth: int) -> List[str]:
+        """
+        Загрузить и обработать одну страницу.
+
+        Returns:
+            Ссылки для дальнейшего обхода
+        """
 
         # Проверяем ограничения
         if (depth > self.max_depth or
                 len(self.found_pages) >= self.max_pages or
                 archive_url in self.visited_urls):
-            return
+            return []
 
         self.visited_urls.add(archive_url)
         self.logger.debug(f"Обрабатываем (глубина {depth}): {archive_url}")
 
         try:
-            # Соблюдаем rate limiting
-            self.rate_limiter.wait_if_needed()
-
             # Проверяем, не сохранена ли уже страница
             if self.storage_manager.page_exists(archive_url):
                 self.logger.debug(f"Страница уже существует, пропускаем: {archive_url}")
-                return
+                return []
+
+            # Соблюдаем rate limiting (пропущенные страницы не тратят слот)
+            self.rate_limiter.wait_if_needed()
 
             # Загружаем страницу
             response = self.session.get(archive_url, timeout=30)
@@ -121,53 +157,16 @@ class SnapshotCrawler:
             if response.status_code != 200:
                 self.logger.warning(f"HTTP {response.status_code} для {archive_url}")
                 self.failed_urls.append(archive_url)
-                return
-
-            # Парсим HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Извлекаем информацию о странице
-            timestamp, original_url = ArchiveUrlHelper.extract_timestamp_and_original(archive_url)
-
-            page_info = {
-                'archive_url': archive_url,
-                'original_url': original_url,
-                'timestamp': timestamp,
-                'title': soup.title.string.strip() if soup.title and soup.title.string else '',
-                'content_length': len(response.text),
-                'depth': depth,
-                'links_found': 0,
-                'images_found': 0,
-                'processed_at': time.time()
-            }
-
-            # Подсчитываем ссылки и изображения
-            links = soup.find_all('a', href=True)
-            images = soup.find_all('img', src=True)
-            page_info['links_found'] = len(links)
-            page_info['images_found'] = len(images)
-
-            # Сохраняем контент
-            file_path = self.storage_manager.save_page_content(
-                archive_url=archive_url,
-                content=response.text,
-                metadata=page_info
-            )
+                return []
 
-            page_info['saved_to'] = str(file_path)
-            self.found_pages.append(page_info)
-
-            self.logger.info(f"Сохранено ({len(self.found_pages)}/{self.max_pages}): {page_info['title'][:50]}...")
-
-            # Ищем ссылки на другие страницы того же домена
-            internal_links = self._extract_internal_links(soup, archive_url, target_domain)
-
-            # Рекурсивно обходим найденные ссылки
-            for link_url in internal_links:
-                if len(self.found_pages) < self.max_pages:
-                    self._crawl_recursive(link_url, target_domain, depth + 1)
-                else:
-                    break
+            # Lexbor разбирает bytes только как UTF-8, а response.text для text/html
+            # без charset декодирует как ISO-8859-1 - декодируем сами
+            html, charset = decode_html(
+                response.content, charset_from_content_type(response.headers.get('Content-Type'))
+            )
+            page_info, links = self._process_page(archive_url, html, target_domain, depth, charset)
+            self._record_page(page_info)
+            return links
 
         except requests.RequestException as e:
             self.logger.error(f"Ошибка запроса для {archive_url}: {e}")
@@ -177,24 +176,118 @@ class SnapshotCrawler:
             self.logger.error(f"Неожиданная ошибка для {archive_url}: {e}")
             self.failed_urls.append(archive_url)
 
-    def _extract_internal_links(self, soup: BeautifulSoup, base_archive_url: str, target_domain: str) -> List[str]:
-        """Извлечь внутренние ссылки сайта из HTML."""
+        return []
+
+    def _process_page(
+            self,
+            archive_url: str,
+            html: str,
+            target_domain: str,
+            depth: int,
+            charset: str
+    ) -> Tuple[Dict, List[str]]:
+        """
+        Разобрать и сохранить загруженную страницу.
+
+        Страница сохраняется в UTF-8, charset - исходная кодировка ответа.
+        Общее состояние краулера не меняется (см. _record_page), поэтому
+        метод можно выполнять в пуле потоков.
+
+        Returns:
+            (метаданные страницы, внутренние ссылки для дальнейшего обхода)
+        """
+
+        # Парсим HTML (Lexbor - C-парсер, в разы быстрее BeautifulSoup)
+        tree = LexborHTMLParser(html)
+        # Заголовок берем из индекса тегов Lexbor, без CSS-движка
+        title_nodes = tree.tags('title')
+        title_node = title_nodes[0] if title_nodes else None
+
+        # Извлекаем информацию о странице
+        timestamp, original_url = ArchiveUrlHelper.extract_timestamp_and_original(archive_url)
+
+        page_info = {
+            'archive_url': archive_url,
+            'original_url': original_url,
+            'timestamp': timestamp,
+            'title': title_node.text(strip=True) if title_node else '',
+            'content_length': len(html),
+            'source_charset': charset,
+            'depth': depth,
+            'links_found': 0,
+            'images_found': 0,
+            'processed_at': time.time()
+        }
+
+        # Подсчитываем ссылки и изображения и ищем ссылки на другие страницы
+        # того же домена за один проход по дереву
+        links_count, images_count, internal_links = self._extract_internal_links(
+            tree, archive_url, target_domain
+        )
+        page_info['links_found'] = links_count
+        page_info['images_found'] = images_count
+
+        # Сохраняем контент
+        file_path = self.storage_manager.save_page_content(
+            archive_url=archive_url,
+            content=html,
+            metadata=page_info
+        )
+
+        page_info['saved_to'] = str(file_path)
+
+        return page_info, internal_links
+
+    def _record_page(self, page_info: Dict):
+        """Добавить сохраненную страницу в found_pages."""
+        self.found_pages.append(page_info)
+
+        self.logger.info(f"Сохранено ({len(self.found_pages)}/{self.max_pages}): {page_info['title'][:50]}...")
+
+    def _extract_internal_links(
+            self,
+            tree: LexborHTMLParser,
+            base_archive_url: str,
+            target_domain: str
+    ) -> Tuple[int, int, List[str]]:
+        """
+        Извлечь внутренние ссылки сайта из HTML.
+
+        Ссылки и изображения обходятся одним селектором, поэтому заодно
+        считаются их количества.
+
+        Returns:
+            (количество ссылок, количество изображений, внутренние ссылки)
+        """
 
         internal_links = []
-        timestamp, _ = ArchiveUrlHelper.extract_timestamp_and_original(base_archive_url)
+        links_count = 0
+        images_count = 0
+        seen_hrefs: Set[str] = set()
 
-        links = soup.find_all('a', href=True)
+        # Разбираем базовую ссылку один раз на страницу, а не на каждую ссылку
+        timestamp, original_base = ArchiveUrlHelper.extract_timestamp_and_original(base_archive_url)
+        base_domain = ArchiveUrlHelper.get_domain(base_archive_url)
 
-        for link in links:
-            href = link['href'].strip()
-            if not href or href.startswith('#'):
+        for node in tree.css(_LINKS_AND_IMAGES_SELECTOR):
+            if node.tag == 'img':
+                images_count += 1
                 continue
 
+            links_count += 1
+            href = (node.attributes.get('href') or '').strip()
+            if not href or href.startswith('#') or href in seen_hrefs:
+                continue
+            seen_hrefs.add(href)
+
             archive_link = None
 
             # Относительная ссылка
             if href.startswith('/'):
-                archive_link = ArchiveUrlHelper.convert_relative_to_archive(href, base_archive_url)
+                if timestamp and original_base:
+                    archive_link = ArchiveUrlHelper.build_archive_url(
+                        timestamp, urljoin(original_base, href)
+                    )
 
             # Абсолютная ссылка того же домена
             elif target_domain in href:
@@ -205,12 +298,178 @@ class SnapshotCrawler:
                     # Обычная ссылка, преобразуем в архивную
                     archive_link = ArchiveUrlHelper.build_archive_url(timestamp, href)
 
-            # Проверяем что ссылка валидна и принадлежит нашему домену
+            # Проверяем что ссылка валидна, еще не посещена и принадлежит нашему домену
+            # (дешевая проверка по множеству - до разбора URL)
             if (archive_link and
-                    ArchiveUrlHelper.is_same_domain(archive_link, base_archive_url) and
-                    archive_link not in self.visited_urls):
+                    archive_link not in self.visited_urls and
+                    ArchiveUrlHelper.get_domain(archive_link) == base_domain):
 
                 internal_links.append(archive_link)
 
         self.logger.debug(f"Найдено внутренних ссылок: {len(internal_links)}")
-        return internal_links
\ No newline at end of file
+        return links_count, images_count, internal_links
+
+
+class AsyncSnapshotCrawler(SnapshotCrawler):
+    """Асинхронный вариант краулера: несколько страниц загружаются одновременно.
+
+    Обход в ширину через общую очередь (url, глубина), которую разбирают
+    max_concurrent корутин на одной aiohttp сессии. Все корутины работают
+    в одном event loop, поэтому visited_urls и found_pages не требуют блокировок.
+    Разбор и сохранение страниц - как у SnapshotCrawler.
+    """
+
+    def __init__(
+            self,
+            storage_manager: StorageManager,
+            rate_limiter: RateLimiter,
+            max_depth: int = 3,
+            max_pages: int = 100,
+            max_concurrent: int = 5
+    ):
+        super().__init__(storage_manager, rate_limiter, max_depth, max_pages)
+        self.max_concurrent = max_concurrent
+
+        # Пул потоков для разбора и сохранения страниц (создается на время обхода)
+        self.parse_workers = min(max_concurrent, os.cpu_count() or 1)
+        self._parse_pool: Optional[ThreadPoolExecutor] = None
+        self._pages_in_progress = 0
+
+    async def crawl_snapshot(self, start_archive_url: str) -> Dict:
+        """
+        Полный обход архивного снапшота сайта с параллельной загрузкой страниц.
+
+        Args:
+            start_archive_url: Стартовая архивная ссылка
+
+        Returns:
+            Словарь с результатами обхода
+        """
+        target_domain = self._start_crawl(start_archive_url)
+
+        start_time = time.time()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait((start_archive_url, 0))
+
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrent)
+        timeout = aiohttp.ClientTimeout(total=30)
+
+        self._parse_pool = ThreadPoolExecutor(max_workers=self.parse_workers)
+        try:
+            async with aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=timeout,
+                    headers=dict(self.session.headers)
+            ) as session:
+
+                workers = [
+                    asyncio.create_task(self._crawl_worker(session, queue, target_domain))
+                    for _ in range(self.max_concurrent)
+                ]
+
+                # Ждем, пока не будут обработаны все URL, включая найденные по ходу
+                await queue.join()
+
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+
+        end_time = time.time()
+
+        return self._finish_crawl(start_archive_url, target_domain, end_time - start_time)
+
+    async def _crawl_worker(
+            self,
+            session: aiohttp.ClientSession,
+            queue: asyncio.Queue,
+            target_domain: str
+    ):
+        """Корутина-обработчик: берет URL из очереди и добавляет найденные ссылки."""
+        while True:
+            archive_url, depth = await queue.get()
+            try:
+                for link_url in await self._crawl_page(session, archive_url, target_domain, depth):
+                    queue.put_nowait((link_url, depth + 1))
+            finally:
+                queue.task_done()
+
+    async def _crawl_page(
+            self,
+            session: aiohttp.ClientSession,
+            archive_url: str,
+            target_domain: str,
+            depth: int
+    ) -> List[str]:
+        """Загрузить и обработать одну страницу.
+
+        Returns:
+            Ссылки для дальнейшего обхода
+        """
+
+        # Проверяем ограничения. Между проверкой и добавлением в visited_urls
+        # нет await, поэтому в одном event loop блокировка не нужна
+        if (depth > self.max_depth or
+                len(self.found_pages) >= self.max_pages or
+                archive_url in self.visited_urls):
+            return []
+
+        self.visited_urls.add(archive_url)
+        self.logger.debug(f"Обрабатываем (глубина {depth}): {archive_url}")
+
+        try:
+            # Проверяем, не сохранена ли уже страница
+            if self.storage_manager.page_exists(archive_url):
+                self.logger.debug(f"Страница уже существует, пропускаем: {archive_url}")
+                return []
+
+            # Соблюдаем rate limiting (пропущенные страницы не тратят слот)
+            await self.rate_limiter.acquire()
+
+            # Загружаем страницу
+            async with session.get(archive_url) as response:
+                if response.status != 200:
+                    self.logger.warning(f"HTTP {response.status} для {archive_url}")
+                    self.failed_urls.append(archive_url)
+                    return []
+
+                # Лимит мог быть достигнут другими корутинами, пока ждали ответа -
+                # тогда не читаем тело вовсе
+                if len(self.found_pages) + self._pages_in_progress >= self.max_pages:
+                    return []
+
+                content = await response.read()
+                content_type = response.headers.get('Content-Type')
+
+            # Пока тело загружалось, лимит мог быть набран другими корутинами
+            if len(self.found_pages) + self._pages_in_progress >= self.max_pages:
+                return []
+
+            html, charset = decode_html(content, charset_from_content_type(content_type))
+
+            # Разбор и запись на диск идут в пуле потоков, а event loop
+            # тем временем продолжает загрузку других страниц
+            self._pages_in_progress += 1
+            try:
+                page_info, links = await asyncio.get_running_loop().run_in_executor(
+                    self._parse_pool, self._process_page, archive_url, html, target_domain, depth, charset
+                )
+            finally:
+                self._pages_in_progress -= 1
+
+            # found_pages меняется только в event loop
+            self._record_page(page_info)
+            return links
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Ошибка запроса для {archive_url}: {e}")
+            self.failed_urls.append(archive_url)
+
+        except Exception as e:
+            self.logger.error(f"Неожиданная ошибка для {archive_url}: {e}")
+            self.failed_urls.append(archive_url)
+
+        return []
@@ -2,21 +2,39 @@
 
 import asyncio
 import aiohttp
-import json
+import aiofiles
+import orjson
+import os
+import random
 import time
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 
 from .storage_manager import StorageManager
+from ..utils.html_encoding import charset_from_content_type, decode_html
 from ..utils.rate_limiter import RateLimiter
 
+# Повторные попытки при временных ошибках архива
+_MAX_ATTEMPTS = 3
+_BACKOFF_BASE_SECONDS = 1.0
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# orjson: отступ 2 и UTF-8 без экранирования, как json.dump(indent=2, ensure_ascii=False)
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# Ссылки и изображения считаются одним запросом к дереву
+_LINKS_AND_IMAGES_SELECTOR = 'a[href], img'
+
 
 class SnapshotDownloader:
     """Загрузчик для массового скачивания снапшотов на конкретную дату."""
 
+    # Символы URL, которые заменяются на '_' в именах файлов
+    _SAFE_TRANS = str.maketrans({c: '_' for c in '/?&=:#%'})
+
     def __init__(
             self,
             storage_manager: StorageManager,
@@ -40,9 +58,49 @@ class SnapshotDownloader:
             'total_size_mb': 0
         }
 
-        # Список неудачных загрузок для повторных попыток
+        # Снапшоты, которые не удалось скачать после всех попыток
         self.failed_downloads = []
 
+        # Общая HTTP-сессия: keep-alive соединения с web.archive.org
+        # переиспользуются между батчами и повторными попытками
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'SnapshotDownloader':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Закрыть общую HTTP-сессию."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Получить общую HTTP-сессию, создав ее при первом обращении."""
+        if self._session is None or self._session.closed:
+            # DNS-ответ для web.archive.org кэшируется на 5 минут на всю сессию.
+            # Резолвер - по умолчанию aiohttp: при установленном aiodns это уже
+            # AsyncResolver, иначе getaddrinfo в пуле потоков (event loop не блокируется)
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent,
+                limit_per_host=self.max_concurrent,
+                ttl_dns_cache=300,
+                keepalive_timeout=85,
+                enable_cleanup_closed=True
+            )
+
+            timeout = aiohttp.ClientTimeout(total=60, connect=30)
+
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={'User-Agent': 'Mozilla/5.0 (compatible; WaybackAnalyzer/1.0)'}
+            )
+
+        return self._session
+
     async def download_snapshot_batch(
             self,
             domain: str,
@@ -77,57 +135,58 @@ class SnapshotDownloader:
             self.logger.info("✅ Все страницы уже скачаны")
             return self._build_result_summary(domain, date, 0)
 
-        # Асинхронное скачивание
-        connector = aiohttp.TCPConnector(
-            limit=self.max_concurrent,
-            limit_per_host=self.max_concurrent,
-            keepalive_timeout=60
-        )
-
-        timeout = aiohttp.ClientTimeout(total=60, connect=30)
+        session = self._get_session()
 
-        async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout,
-                headers={'User-Agent': 'Mozilla/5.0 (compatible; WaybackAnalyzer/1.0)'}
-        ) as session:
-
-            # Создаем семафор для ограничения конкурентности
-            semaphore = asyncio.Semaphore(self.max_concurrent)
-
-            # Создаем задачи для всех снапшотов
-            tasks = []
-            for i, snapshot in enumerate(snapshots):
-                task = self._download_single_snapshot(
-                    session, semaphore, snapshot, domain, date, i + 1, len(snapshots)
-                )
-                tasks.append(task)
-
-            # Выполняем все задачи с отображением прогресса
-            self.logger.info(f"⬇️  Начинаем параллельное скачивание ({self.max_concurrent} потоков)")
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Обрабатываем результаты
-            for result in results:
-                if isinstance(result, Exception):
-                    self.stats['failed'] += 1
-                    self.logger.error(f"❌ Исключение при скачивании: {result}")
-                elif result:
-                    self.stats['successful'] += 1
-                else:
-                    self.stats['failed'] += 1
+        # Асинхронное скачивание
+        self.logger.info(f"⬇️  Начинаем параллельное скачивание ({self.max_concurrent} потоков)")
+        await self._download_snapshots(session, snapshots, domain, date)
 
         # Сохраняем манифест снапшота
         await self._save_snapshot_manifest(domain, date, snapshots)
 
-        # Повторные попытки для неудачных загрузок
-        if self.failed_downloads:
-            self.logger.info(f"🔄 Повторные попытки для {len(self.failed_downloads)} неудачных загрузок")
-            await self._retry_failed_downloads(domain, date)
-
         return self._build_result_summary(domain, date, len(snapshots))
 
+    async def _download_snapshots(
+            self,
+            session: aiohttp.ClientSession,
+            snapshots: List[Dict[str, Any]],
+            domain: str,
+            date: str
+    ) -> int:
+        """
+        Скачать список снапшотов через переданную сессию.
+
+        Returns:
+            Количество успешных загрузок
+        """
+
+        # Создаем семафор для ограничения конкурентности
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        # Создаем задачи для всех снапшотов
+        tasks = []
+        for i, snapshot in enumerate(snapshots):
+            task = self._download_single_snapshot(
+                session, semaphore, snapshot, domain, date, i + 1, len(snapshots)
+            )
+            tasks.append(task)
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Обрабатываем результаты
+        successful = 0
+        for result in results:
+            if isinstance(result, Exception):
+                self.stats['failed'] += 1
+                self.logger.error(f"❌ Исключение при скачивании: {result}")
+            elif result:
+                self.stats['successful'] += 1
+                successful += 1
+            else:
+                self.stats['failed'] += 1
+
+        return successful
+
     async def _download_single_snapshot(
             self,
             session: aiohttp.ClientSession,
@@ -138,59 +197,132 @@ class SnapshotDownloader:
             current: int,
             total: int
     ) -> bool:
-        """Скачать один снапшот."""
-
-        async with semaphore:
-            # Rate limiting
-            await asyncio.sleep(1.0 / (1.0 / self.rate_limiter.delay))
-
-            archive_url = snapshot['archive_url']
-            original_url = snapshot['original_url']
-
-            try:
-                # Показываем прогресс
-                if current % 10 == 0 or current == 1:
-                    self.logger.info(f"📄 [{current}/{total}] Скачиваю: {original_url}")
-
-                async with session.get(archive_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-
-                        # Извлекаем базовые метаданные
-                        metadata = self._extract_page_metadata(content, snapshot)
-
-                        # Сохраняем страницу
-                        await self._save_page_to_snapshot_dir(
-                            domain, date, original_url, content, metadata
-                        )
-
-                        # Обновляем статистику
-                        content_size_mb = len(content.encode('utf-8')) / (1024 * 1024)
-                        self.stats['total_size_mb'] += content_size_mb
-
-                        return True
-
-                    else:
-                        self.logger.warning(f"⚠️  HTTP {response.status} для {archive_url}")
+        """Скачать один снапшот, повторяя запрос при временных ошибках."""
+
+        archive_url = snapshot['archive_url']
+        original_url = snapshot['original_url']
+
+        # Показываем прогресс
+        if current % 10 == 0 or current == 1:
+            self.logger.info(f"📄 [{current}/{total}] Скачиваю: {original_url}")
+
+        for attempt in range(_MAX_ATTEMPTS):
+            is_last_attempt = attempt == _MAX_ATTEMPTS - 1
+            retry_after = None
+
+            async with semaphore:
+                # Rate limiting: общий темп для всех корутин
+                await self.rate_limiter.acquire()
+
+                try:
+                    async with session.get(archive_url) as response:
+                        if response.status == 200:
+                            # Размер считаем по байтам ответа, а декодируем один раз
+                            raw = await response.read()
+                            content = self._decode_content(raw, response.headers.get('Content-Type'))
+
+                            # Разбираем HTML один раз и извлекаем базовые метаданные из дерева
+                            tree = self._parse_page(content)
+                            metadata = self._extract_page_metadata(
+                                tree, snapshot, len(content), len(raw)
+                            )
+
+                            # Сохраняем страницу
+                            await self._save_page_to_snapshot_dir(
+                                domain, date, original_url, content, metadata
+                            )
+
+                            # Обновляем статистику
+                            content_size_mb = len(raw) / (1024 * 1024)
+                            self.stats['total_size_mb'] += content_size_mb
+
+                            return True
+
+                        if response.status not in _RETRY_STATUSES or is_last_attempt:
+                            self.logger.warning(f"⚠️  HTTP {response.status} для {archive_url}")
+                            self.failed_downloads.append(snapshot)
+                            return False
+
+                        reason = f"HTTP {response.status}"
+                        retry_after = response.headers.get('Retry-After')
+
+                except asyncio.TimeoutError:
+                    if is_last_attempt:
+                        self.logger.warning(f"⏱️  Таймаут для {archive_url}")
                         self.failed_downloads.append(snapshot)
                         return False
+                    reason = "таймаут"
 
-            except asyncio.TimeoutError:
-                self.logger.warning(f"⏱️  Таймаут для {archive_url}")
-                self.failed_downloads.append(snapshot)
-                return False
+                except aiohttp.ClientConnectionError as e:
+                    if is_last_attempt:
+                        self.logger.error(f"❌ Ошибка соединения для {archive_url}: {e}")
+                        self.failed_downloads.append(snapshot)
+                        return False
+                    reason = f"ошибка соединения: {e}"
+
+                except Exception as e:
+                    self.logger.error(f"❌ Ошибка при скачивании {archive_url}: {e}")
+                    self.failed_downloads.append(snapshot)
+                    return False
+
+            # Ждем вне семафора, чтобы не занимать слот у остальных загрузок
+            delay = self._backoff_delay(attempt, retry_after)
+            self.logger.debug(
+                f"🔄 {reason} для {archive_url}, попытка {attempt + 2}/{_MAX_ATTEMPTS} через {delay:.1f}с"
+            )
+            await asyncio.sleep(delay)
+
+        return False
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Экспоненциальная задержка со случайным разбросом (не меньше Retry-After)."""
+        delay = _BACKOFF_BASE_SECONDS * 2 ** attempt + random.uniform(0, _BACKOFF_BASE_SECONDS)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def _decode_content(self, raw: bytes, content_type: Optional[str]) -> str:
+        """Декодировать тело ответа по кодировке из Content-Type или самой страницы."""
+        content, _ = decode_html(raw, charset_from_content_type(content_type))
+        return content
+
+    def _parse_page(self, content: str) -> Optional[LexborHTMLParser]:
+        """Разобрать HTML один раз на загрузку (None, если разбор не удался)."""
+        try:
+            # Lexbor - C-парсер: дерево не строится из Python-объектов
+            return LexborHTMLParser(content)
+        except Exception as e:
+            self.logger.debug(f"Не удалось разобрать HTML: {e}")
+            return None
 
-            except Exception as e:
-                self.logger.error(f"❌ Ошибка при скачивании {archive_url}: {e}")
-                self.failed_downloads.append(snapshot)
-                return False
+    def _extract_page_metadata(
+            self,
+            tree: Optional[LexborHTMLParser],
+            snapshot: Dict[str, Any],
+            content_length: int,
+            byte_length: int
+    ) -> Dict[str, Any]:
+        """
+        Извлечь метаданные страницы из уже разобранного дерева.
 
-    def _extract_page_metadata(self, content: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
-        """Извлечь метаданные страницы."""
+        Args:
+            tree: Дерево страницы из _parse_page
+            snapshot: Запись снапшота
+            content_length: Длина декодированного текста в символах
+            byte_length: Размер тела ответа в байтах
+        """
 
+        links_count = 0
+        images_count = 0
         try:
-            soup = BeautifulSoup(content, 'html.parser')
-            title = soup.title.string.strip() if soup.title and soup.title.string else "Без заголовка"
+            title_nodes = tree.tags('title')
+            title = title_nodes[0].text(strip=True) if title_nodes else ''
+            title = title or "Без заголовка"
+            for node in tree.css(_LINKS_AND_IMAGES_SELECTOR):
+                if node.tag == 'img':
+                    images_count += 1
+                else:
+                    links_count += 1
         except:
             title = "Ошибка извлечения заголовка"
 
@@ -199,14 +331,14 @@ class SnapshotDownloader:
             'original_url': snapshot['original_url'],
             'timestamp': snapshot['timestamp'],
             'title': title,
-            'content_length': len(content),
-            'content_length_mb': round(len(content.encode('utf-8')) / (1024 * 1024), 3),
+            'content_length': content_length,
+            'content_length_mb': round(byte_length / (1024 * 1024), 3),
             'statuscode': snapshot.get('statuscode', '200'),
             'size': snapshot.get('size', 0),
             'days_diff': snapshot.get('days_diff', 0),
             'downloaded_at': datetime.now().isoformat(),
-            'extracted_links': len(soup.find_all('a', href=True)) if 'soup' in locals() else 0,
-            'extracted_images': len(soup.find_all('img')) if 'soup' in locals() else 0
+            'extracted_links': links_count,
+            'extracted_images': images_count
         }
 
     async def _save_page_to_snapshot_dir(
@@ -225,14 +357,15 @@ class SnapshotDownloader:
         snapshot_dir = self.storage_manager.base_path / "snapshots" / domain / date
 
         # Сохраняем HTML
+        # Запись через aiofiles не блокирует event loop, пока другие страницы загружаются
         html_path = snapshot_dir / f"{safe_filename}.html"
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        async with aiofiles.open(html_path, 'w', encoding='utf-8') as f:
+            await f.write(content)
 
         # Сохраняем метаданные
         meta_path = snapshot_dir / f"{safe_filename}.html.meta.json"
-        with open(meta_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        async with aiofiles.open(meta_path, 'wb') as f:
+            await f.write(orjson.dumps(metadata, option=_JSON_OPTIONS))
 
     def _url_to_safe_filename(self, url: str) -> str:
         """Преобразовать URL в безопасное имя файла."""
@@ -242,9 +375,8 @@ class SnapshotDownloader:
         if '://' in url:
             url = url.split('://', 1)[1]
 
-        # Заменяем специальные символы
-        safe_name = url.replace('/', '_').replace('?', '_').replace('&', '_').replace('=', '_')
-        safe_name = safe_name.replace(':', '_').replace('#', '_').replace('%', '_')
+        # Заменяем специальные символы (один проход по строке)
+        safe_name = url.translate(self._SAFE_TRANS)
 
         # Ограничиваем длину
         if len(safe_name) > 150:
@@ -257,12 +389,15 @@ class SnapshotDownloader:
     def _filter_existing_pages(self, snapshots: List[Dict], snapshot_dir: Path) -> List[Dict]:
         """Фильтровать уже скачанные страницы для resume режима."""
 
+        # Один листинг директории вместо stat() на каждый снапшот
+        with os.scandir(snapshot_dir) as entries:
+            existing = {entry.name for entry in entries if entry.name.endswith('.html')}
+
         filtered = []
         for snapshot in snapshots:
             safe_filename = self._url_to_safe_filename(snapshot['original_url'])
-            html_path = snapshot_dir / f"{safe_filename}.html"
 
-            if not html_path.exists():
+            if f"{safe_filename}.html" not in existing:
                 filtered.append(snapshot)
             else:
                 self.stats['skipped'] += 1
@@ -293,27 +428,8 @@ class SnapshotDownloader:
             'snapshots_metadata': original_snapshots[:10]  # Первые 10 для примера
         }
 
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-
-    async def _retry_failed_downloads(self, domain: str, date: str):
-        """Повторные попытки для неудачных загрузок."""
-
-        if not self.failed_downloads:
-            return
-
-        retry_snapshots = self.failed_downloads.copy()
-        self.failed_downloads.clear()
-
-        # Увеличиваем задержки для повторных попыток
-        original_delay = self.rate_limiter.delay
-        self.rate_limiter.delay *= 2  # Удваиваем задержку
-
-        try:
-            result = await self.download_snapshot_batch(domain, date, retry_snapshots)
-            self.logger.info(f"🔄 Повторные попытки: {result['successful']} успешно")
-        finally:
-            self.rate_limiter.delay = original_delay
+        async with aiofiles.open(manifest_path, 'wb') as f:
+            await f.write(orjson.dumps(manifest, option=_JSON_OPTIONS))
 
     def _build_result_summary(self, domain: str, date: str, total_attempted: int) -> Dict[str, Any]:
         """Построить итоговую сводку результатов."""
@@ -3,7 +3,6 @@ from datetime import date, timedelta
 from typing import List, Optional, Dict
 from waybackpy import WaybackMachineCDXServerAPI
 from ..models.political_events import PoliticalEvent
-from ..utils.date_matcher import find_closest_snapshots
 
 class PoliticalSnapshotFinder:
     def __init__(self, user_agent: str = "UkrainePoliticalAnalyzer/1.0"):
@@ -22,8 +21,16 @@ class PoliticalSnapshotFinder:
         start_date = event.date - timedelta(days=days_before)
         end_date = event.date + timedelta(days=days_after)
 
-        # Ищем снапшоты в указанном диапазоне
-        cdx_api = WaybackMachineCDXServerAPI(site_url, self.user_agent)
+        # Границы окон как строки YYYYMMDDhhmmss: такие timestamp упорядочены
+        # лексикографически, поэтому сравниваются без разбора в datetime
+        start_ts = start_date.strftime('%Y%m%d') + '000000'
+        event_end_ts = event.date.strftime('%Y%m%d') + '235959'
+        end_ts = end_date.strftime('%Y%m%d') + '235959'
+
+        # Ищем снапшоты в указанном диапазоне (окно ограничивает и сам CDX)
+        cdx_api = WaybackMachineCDXServerAPI(
+            site_url, self.user_agent, start_timestamp=start_ts, end_timestamp=end_ts
+        )
 
         snapshots = {
             'before_event': [],
@@ -37,22 +44,29 @@ class PoliticalSnapshotFinder:
 
         try:
             for snapshot in cdx_api.snapshots():
-                snapshot_date = datetime.strptime(snapshot.timestamp, "%Y%m%d%H%M%S").date()
+                if not start_ts <= snapshot.timestamp <= end_ts:
+                    continue
+
+                # waybackpy уже разобрал timestamp - дата нужна только для разницы в днях,
+                # а ISO-строку берем срезами timestamp без isoformat()
+                timestamp = snapshot.timestamp
+                snapshot_date = snapshot.datetime_timestamp.date()
+                snapshot_day = f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
 
-                if start_date <= snapshot_date <= event.date:
+                if timestamp <= event_end_ts:
                     snapshots['before_event'].append({
                         'url': snapshot.archive_url,
-                        'timestamp': snapshot.timestamp,
-                        'date': snapshot_date.isoformat(),
+                        'timestamp': timestamp,
+                        'date': snapshot_day,
                         'original_url': snapshot.original,
                         'status_code': snapshot.statuscode,
                         'days_to_event': (event.date - snapshot_date).days
                     })
-                elif event.date < snapshot_date <= end_date:
+                else:
                     snapshots['after_event'].append({
                         'url': snapshot.archive_url,
-                        'timestamp': snapshot.timestamp,
-                        'date': snapshot_date.isoformat(),
+                        'timestamp': timestamp,
+                        'date': snapshot_day,
                         'original_url': snapshot.original,
                         'status_code': snapshot.statuscode,
                         'days_from_event': (snapshot_date - event.date).days
@@ -61,8 +75,9 @@ class PoliticalSnapshotFinder:
         except Exception as e:
             print(f"Ошибка при поиске снапшотов: {e}")
 
-        # Сортируем по близости к событию
-        snapshots['before_event'].sort(key=lambda x: x['days_to_event'])
-        snapshots['after_event'].sort(key=lambda x: x['days_from_event'])
+        # Упорядочиваем по близости к событию. CDX отдает снапшоты по возрастанию
+        # timestamp, поэтому after_event уже отсортирован, а before_event
+        # достаточно развернуть - сортировка не нужна
+        snapshots['before_event'].reverse()
 
         return snapshots
\ No newline at end of file
@@ -1,16 +1,23 @@
 """Менеджер для структурированного хранения архивных данных."""
 
 import os
-import json
+import orjson
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from datetime import datetime
 import hashlib
 
+# orjson пишет UTF-8 байты с отступом 2, как json.dump(indent=2, ensure_ascii=False);
+# нестроковые ключи (например, номера глубины) приводятся к строкам, как в json
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
 
 class StorageManager:
     """Управляет сохранением архивных данных в файловую систему."""
 
+    # Символы URL, которые заменяются на '_' в именах файлов
+    _FILENAME_TRANS = str.maketrans({c: '_' for c in '/?&='})
+
     def __init__(self, base_path: Path = Path("./archive_data")):
         """
         Args:
@@ -27,7 +34,7 @@ class StorageManager:
     def save_page_content(
             self,
             archive_url: str,
-            content: str,
+            content: Union[str, bytes],
             metadata: Optional[Dict[str, Any]] = None
     ) -> Path:
         """
@@ -35,7 +42,7 @@ class StorageManager:
 
         Args:
             archive_url: URL архивной страницы
-            content: HTML контент
+            content: HTML контент (bytes сохраняются как есть, без перекодирования)
             metadata: Дополнительные метаданные
 
         Returns:
@@ -64,8 +71,11 @@ class StorageManager:
         file_path = snapshot_dir / file_name
 
         # Сохраняем HTML контент
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        if isinstance(content, bytes):
+            file_path.write_bytes(content)
+        else:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
 
         # Сохраняем метаданные
         if metadata is None:
@@ -82,8 +92,7 @@ class StorageManager:
         })
 
         metadata_path = snapshot_dir / f"{file_name}.meta.json"
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        metadata_path.write_bytes(orjson.dumps(metadata, option=_JSON_OPTIONS))
 
         return file_path
 
@@ -104,8 +113,7 @@ class StorageManager:
 
         summary_path = summary_dir / f"snapshot_{timestamp}_summary.json"
 
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary_data, f, indent=2, ensure_ascii=False)
+        summary_path.write_bytes(orjson.dumps(summary_data, option=_JSON_OPTIONS))
 
         return summary_path
 
@@ -119,21 +127,24 @@ class StorageManager:
 
         return self.base_path / "snapshots" / safe_domain / timestamp
 
-    def page_exists(self, archive_url: str) -> bool:
-        """Проверить, существует ли уже сохраненная страница."""
+    def get_page_path(self, archive_url: str) -> Optional[Path]:
+        """Путь, по которому save_page_content сохраняет страницу (None для не архивной ссылки)."""
         from ..utils.url_helper import ArchiveUrlHelper
 
         timestamp, original_url = ArchiveUrlHelper.extract_timestamp_and_original(archive_url)
         if not timestamp or not original_url:
-            return False
+            return None
 
         domain = ArchiveUrlHelper.get_domain(original_url)
         safe_domain = domain.replace('.', '_').replace('-', '_')
 
         file_name = self._url_to_filename(original_url)
-        file_path = self.base_path / "snapshots" / safe_domain / timestamp / file_name
+        return self.base_path / "snapshots" / safe_domain / timestamp / file_name
 
-        return file_path.exists()
+    def page_exists(self, archive_url: str) -> bool:
+        """Проверить, существует ли уже сохраненная страница."""
+        file_path = self.get_page_path(archive_url)
+        return file_path is not None and file_path.exists()
 
     def _url_to_filename(self, url: str) -> str:
         """Преобразовать URL в безопасное имя файла."""
@@ -141,8 +152,8 @@ class StorageManager:
         if '://' in url:
             url = url.split('://', 1)[1]
 
-        # Заменяем специальные символы
-        filename = url.replace('/', '_').replace('?', '_').replace('&', '_').replace('=', '_')
+        # Заменяем специальные символы (один проход по строке)
+        filename = url.translate(self._FILENAME_TRANS)
 
         # Ограничиваем длину и добавляем расширение
         if len(filename) > 200:
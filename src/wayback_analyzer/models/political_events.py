@@ -1,10 +1,13 @@
 """Модели политических событий для анализа украинских партий."""
 
+from bisect import bisect_left, bisect_right
+from collections import Counter
 from datetime import date, datetime, timedelta
 from enum import Enum
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterable, Optional, Tuple
 from dataclasses import dataclass, field
-from pydantic import BaseModel
+
+from ..utils.interval_tree import IntervalTree
 
 
 class EventType(Enum):
@@ -26,9 +29,28 @@ class EventImportance(Enum):
     LOW = "low"          # Низкая важность
 
 
-@dataclass
+# Целочисленные коды членов перечислений: в горячих циклах фильтрации
+# сравниваются int, а не хэши Enum (Enum.__hash__ написан на Python)
+_EVENT_TYPE_CODES: Dict[EventType, int] = {member: code for code, member in enumerate(EventType)}
+_IMPORTANCE_CODES: Dict[EventImportance, int] = {member: code for code, member in enumerate(EventImportance)}
+
+
+# Глобальный реестр тегов: тег -> целочисленный id для быстрых пересечений множеств
+TAG_IDS: Dict[str, int] = {}
+
+
+def _tag_id(tag: str) -> int:
+    """Получить id тега, зарегистрировав его при первом обращении."""
+    return TAG_IDS.setdefault(tag, len(TAG_IDS))
+
+
+# Пробелы в slug заменяются на '_', скобки удаляются
+_SLUG_TRANS = str.maketrans({' ': '_', '(': None, ')': None})
+
+
+@dataclass(frozen=True)
 class PoliticalEvent:
-    """Модель политического события."""
+    """Модель политического события (неизменяемая после создания)."""
     name: str
     date: date
     event_type: EventType
@@ -38,27 +60,53 @@ class PoliticalEvent:
     analysis_window_days_after: int = 30
     tags: List[str] = field(default_factory=list)
 
+    def __post_init__(self):
+        # Производные значения считаются один раз при создании события:
+        # id тегов из TAG_IDS, коды типа и важности, границы окна анализа
+        # как date.toordinal(), диапазон дат и slug. Это обычные атрибуты,
+        # а не поля dataclass, поэтому они не попадают в asdict() и сравнение
+        date_ord = self.date.toordinal()
+        start_ord = date_ord - self.analysis_window_days_before
+        end_ord = date_ord + self.analysis_window_days_after
+
+        derived = {
+            '_tag_ids': frozenset(_tag_id(tag) for tag in self.tags),
+            '_type_code': _EVENT_TYPE_CODES[EventType(self.event_type)],
+            '_importance_code': _IMPORTANCE_CODES[EventImportance(self.importance)],
+            '_start_ord': start_ord,
+            '_end_ord': end_ord,
+            '_date_range': (date.fromordinal(start_ord), date.fromordinal(end_ord)),
+            '_slug': self.name.lower().translate(_SLUG_TRANS),
+        }
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        # Id тегов из TAG_IDS действительны только в своем процессе,
+        # поэтому при распаковке производные поля считаются заново
+        return (self.__class__, (
+            self.name, self.date, self.event_type, self.description, self.importance,
+            self.analysis_window_days_before, self.analysis_window_days_after, self.tags,
+        ))
+
     @property
     def date_range(self) -> Tuple[date, date]:
         """Получить диапазон дат для анализа."""
-        start_date = self.date - timedelta(days=self.analysis_window_days_before)
-        end_date = self.date + timedelta(days=self.analysis_window_days_after)
-        return (start_date, end_date)
+        return self._date_range
 
     @property
     def slug(self) -> str:
         """Получить slug для файловой системы."""
-        return self.name.lower().replace(' ', '_').replace('(', '').replace(')', '')
+        return self._slug
 
     def is_in_range(self, check_date: date, buffer_days: int = 0) -> bool:
         """Проверить, попадает ли дата в диапазон события."""
-        start_date = self.date - timedelta(days=self.analysis_window_days_before + buffer_days)
-        end_date = self.date + timedelta(days=self.analysis_window_days_after + buffer_days)
-        return start_date <= check_date <= end_date
+        return self._start_ord - buffer_days <= check_date.toordinal() <= self._end_ord + buffer_days
 
 
-# Предопределенные политические события для Украины
-UKRAINE_POLITICAL_EVENTS = [
+# Предопределенные политические события для Украины.
+# Неизменяемый кортеж: менеджеры копируют его в собственный список
+UKRAINE_POLITICAL_EVENTS: Tuple[PoliticalEvent, ...] = (
     # ===== ВЫБОРЫ =====
     PoliticalEvent(
         name="Президентские выборы 2019 (1 тур)",
@@ -251,83 +299,152 @@ UKRAINE_POLITICAL_EVENTS = [
         analysis_window_days_before=21,
         analysis_window_days_after=30,
         tags=["мвф", "кредит", "реформы", "экономика", "стабилизация"]
-    )
-]
+    ),
+)
 
 
-class EventFilter(BaseModel):
-    """Фильтр для поиска событий."""
+@dataclass
+class EventFilter:
+    """
+    Фильтр для поиска событий.
+
+    Строковые значения приводятся при создании: типы и важность - к членам
+    перечислений (get_events_by_filter сравнивает их с event_type/importance
+    событий напрямую), даты - из ISO-формата.
+    """
     event_types: Optional[List[EventType]] = None
     importance_levels: Optional[List[EventImportance]] = None
     date_from: Optional[date] = None
     date_to: Optional[date] = None
     tags: Optional[List[str]] = None
 
-    class Config:
-        use_enum_values = True
+    def __post_init__(self):
+        if self.event_types is not None:
+            self.event_types = [EventType(t) for t in self.event_types]
+        if self.importance_levels is not None:
+            self.importance_levels = [EventImportance(i) for i in self.importance_levels]
+        if isinstance(self.date_from, str):
+            self.date_from = date.fromisoformat(self.date_from)
+        if isinstance(self.date_to, str):
+            self.date_to = date.fromisoformat(self.date_to)
+        if self.tags is not None:
+            self.tags = list(self.tags)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EventFilter':
+        """Создать фильтр из словаря (конфиг, аргументы CLI); пустые списки не фильтруют."""
+        return cls(
+            event_types=data.get('event_types') or None,
+            importance_levels=data.get('importance_levels') or None,
+            date_from=data.get('date_from'),
+            date_to=data.get('date_to'),
+            tags=data.get('tags') or None,
+        )
 
 
 class PoliticalEventManager:
     """Менеджер для работы с политическими событиями."""
 
-    def __init__(self, events: List[PoliticalEvent] = None):
-        self.events = events or UKRAINE_POLITICAL_EVENTS
+    def __init__(self, events: Optional[Iterable[PoliticalEvent]] = None):
+        # Собственная отсортированная копия: add_custom_event не трогает
+        # общий UKRAINE_POLITICAL_EVENTS и списки других менеджеров
+        self.events = sorted(events or UKRAINE_POLITICAL_EVENTS, key=lambda x: x.date)
+        # Менеджер на неизмененных предопределенных событиях передается
+        # в дочерние процессы без самих событий (см. __reduce__)
+        self._uses_default_events = not events
+
+        # Индексы строятся при первом запросе и обновляются при добавлении событий:
+        # события по дате с порядковыми номерами дат и дерево окон анализа
+        self._events_by_date: Optional[List[PoliticalEvent]] = None
+        self._date_ordinals: Optional[List[int]] = None
+        self._window_tree: Optional[IntervalTree[PoliticalEvent]] = None
+
+    def __reduce__(self):
+        """
+        Сериализовать менеджер для передачи в процессы-воркеры.
+
+        Предопределенные события есть в каждом процессе как модульный
+        UKRAINE_POLITICAL_EVENTS, поэтому для менеджера без своих событий
+        передается только класс, а не копия всех событий. Индексы не
+        сериализуются и строятся в воркере лениво.
+        """
+        if self._uses_default_events:
+            return (self.__class__, ())
+        return (self.__class__, (self.events,))
+
+    def _date_index(self) -> Tuple[List[PoliticalEvent], List[int]]:
+        """Получить события, отсортированные по дате, и их date.toordinal()."""
+        if self._events_by_date is None:
+            self._events_by_date = sorted(self.events, key=lambda x: x.date)
+            self._date_ordinals = [e.date.toordinal() for e in self._events_by_date]
+        return self._events_by_date, self._date_ordinals
 
     def get_events_by_filter(self, event_filter: EventFilter) -> List[PoliticalEvent]:
-        """Получить события по фильтру."""
-        filtered_events = self.events
-
-        # Фильтр по типам событий
-        if event_filter.event_types:
-            filtered_events = [
-                e for e in filtered_events
-                if e.event_type in event_filter.event_types
-            ]
-
-        # Фильтр по важности
-        if event_filter.importance_levels:
-            filtered_events = [
-                e for e in filtered_events
-                if e.importance in event_filter.importance_levels
-            ]
-
-        # Фильтр по дате от
-        if event_filter.date_from:
-            filtered_events = [
-                e for e in filtered_events
-                if e.date >= event_filter.date_from
-            ]
-
-        # Фильтр по дате до
-        if event_filter.date_to:
-            filtered_events = [
-                e for e in filtered_events
-                if e.date <= event_filter.date_to
-            ]
-
-        # Фильтр по тегам
-        if event_filter.tags:
-            filtered_events = [
-                e for e in filtered_events
-                if any(tag in e.tags for tag in event_filter.tags)
-            ]
-
-        return sorted(filtered_events, key=lambda x: x.date)
+        """
+        Получить события по фильтру.
+
+        Все условия проверяются за один проход по заранее отсортированным
+        событиям, даты сравниваются как порядковые номера.
+        """
+        events, ordinals = self._date_index()
+
+        # Списки фильтра один раз приводятся к множествам кодов: проверка членства за O(1)
+        type_codes = (
+            frozenset(_EVENT_TYPE_CODES[t] for t in event_filter.event_types)
+            if event_filter.event_types else None
+        )
+        importance_codes = (
+            frozenset(_IMPORTANCE_CODES[i] for i in event_filter.importance_levels)
+            if event_filter.importance_levels else None
+        )
+        date_from = event_filter.date_from.toordinal() if event_filter.date_from else None
+        date_to = event_filter.date_to.toordinal() if event_filter.date_to else None
+        # Неизвестные теги не совпадут ни с одним событием - в реестр их не добавляем
+        tag_ids = (
+            frozenset(TAG_IDS[tag] for tag in event_filter.tags if tag in TAG_IDS)
+            if event_filter.tags else None
+        )
+
+        filtered_events = []
+        for event, ordinal in zip(events, ordinals):
+            # Фильтр по типам событий
+            if type_codes is not None and event._type_code not in type_codes:
+                continue
+
+            # Фильтр по важности
+            if importance_codes is not None and event._importance_code not in importance_codes:
+                continue
+
+            # Фильтр по датам
+            if date_from is not None and ordinal < date_from:
+                continue
+            if date_to is not None and ordinal > date_to:
+                continue
+
+            # Фильтр по тегам
+            if tag_ids is not None and event._tag_ids.isdisjoint(tag_ids):
+                continue
+
+            filtered_events.append(event)
+
+        return filtered_events
 
     def get_events_by_type(self, event_type: EventType) -> List[PoliticalEvent]:
         """Получить события по типу."""
-        return [e for e in self.events if e.event_type == event_type]
+        type_code = _EVENT_TYPE_CODES[event_type]
+        return [e for e in self.events if e._type_code == type_code]
 
     def get_critical_events(self) -> List[PoliticalEvent]:
         """Получить критически важные события."""
-        return [e for e in self.events if e.importance == EventImportance.CRITICAL]
+        critical_code = _IMPORTANCE_CODES[EventImportance.CRITICAL]
+        return [e for e in self.events if e._importance_code == critical_code]
 
     def get_events_in_date_range(self, start_date: date, end_date: date) -> List[PoliticalEvent]:
-        """Получить события в диапазоне дат."""
-        return [
-            e for e in self.events
-            if start_date <= e.date <= end_date
-        ]
+        """Получить события в диапазоне дат (бинарным поиском по индексу дат)."""
+        events, ordinals = self._date_index()
+        lo = bisect_left(ordinals, start_date.toordinal())
+        hi = bisect_right(ordinals, end_date.toordinal(), lo)
+        return events[lo:hi]
 
     def find_events_near_date(self, target_date: date, days_window: int = 30) -> List[PoliticalEvent]:
         """Найти события рядом с указанной датой."""
@@ -335,6 +452,46 @@ class PoliticalEventManager:
         end_date = target_date + timedelta(days=days_window)
         return self.get_events_in_date_range(start_date, end_date)
 
+    def events_covering(self, check_date: date, buffer_days: int = 0) -> List[PoliticalEvent]:
+        """
+        Найти события, в окно анализа которых попадает дата.
+
+        Равносильно отбору событий по is_in_range(check_date, buffer_days),
+        но без перебора всех событий: запрос к дереву интервалов.
+
+        Returns:
+            События в порядке начала окна анализа
+        """
+        point = check_date.toordinal()
+        return self._windows().query(point - buffer_days, point + buffer_days)
+
+    def events_covering_many(
+        self, dates: Iterable[date], buffer_days: int = 0
+    ) -> Dict[date, List[PoliticalEvent]]:
+        """
+        Найти события, покрывающие каждую из дат (например, даты снимков).
+
+        Вместо двойного цикла события x снимки - по одному запросу к дереву
+        интервалов на каждую различную дату; повторяющиеся даты снимков
+        обрабатываются один раз.
+
+        Returns:
+            Словарь дата -> события в порядке начала окна анализа
+        """
+        tree = self._windows()
+        result: Dict[date, List[PoliticalEvent]] = {}
+        for check_date in dates:
+            if check_date not in result:
+                point = check_date.toordinal()
+                result[check_date] = tree.query(point - buffer_days, point + buffer_days)
+        return result
+
+    def _windows(self) -> IntervalTree[PoliticalEvent]:
+        """Получить дерево окон анализа событий."""
+        if self._window_tree is None:
+            self._window_tree = IntervalTree((e._start_ord, e._end_ord, e) for e in self.events)
+        return self._window_tree
+
     def get_events_by_year(self, year: int) -> Dict[EventType, List[PoliticalEvent]]:
         """Получить события по году, сгруппированные по типам."""
         year_events = [e for e in self.events if e.date.year == year]
@@ -360,26 +517,53 @@ class PoliticalEventManager:
         """Добавить пользовательское событие."""
         self.events.append(event)
         self.events.sort(key=lambda x: x.date)
+        self._uses_default_events = False
+
+        # Индекс дат обновляем вставкой на место, остальные индексы перестраиваются
+        if self._events_by_date is not None:
+            ordinal = event.date.toordinal()
+            position = bisect_right(self._date_ordinals, ordinal)
+            self._date_ordinals.insert(position, ordinal)
+            self._events_by_date.insert(position, event)
+        self._window_tree = None
 
     def export_events_summary(self) -> Dict:
-        """Экспортировать сводку событий."""
+        """Экспортировать сводку событий (за один проход по событиям)."""
+        by_type = Counter()
+        by_importance = Counter()
+        timeline = Counter()
+        earliest = latest = None
+
+        for event in self.events:
+            by_type[event.event_type] += 1
+            by_importance[event.importance] += 1
+            event_date = event.date
+            timeline[event_date.year] += 1
+            if earliest is None or event_date < earliest:
+                earliest = event_date
+            if latest is None or event_date > latest:
+                latest = event_date
+
+        if earliest is None:
+            raise ValueError("Нет событий для сводки")
+
         return {
             'total_events': len(self.events),
             'by_type': {
-                event_type.value: len(self.get_events_by_type(event_type))
+                event_type.value: by_type[event_type]
                 for event_type in EventType
             },
             'by_importance': {
-                importance.value: len([e for e in self.events if e.importance == importance])
+                importance.value: by_importance[importance]
                 for importance in EventImportance
             },
-            'timeline': self.get_timeline_summary(),
+            'timeline': dict(sorted(timeline.items())),
             'date_range': {
-                'earliest': min(e.date for e in self.events).isoformat(),
-                'latest': max(e.date for e in self.events).isoformat()
+                'earliest': earliest.isoformat(),
+                'latest': latest.isoformat()
             }
         }
 
 
-# Создаем глобальный экземпляр менеджера
+# Создаем глобальный экземпляр менеджера (свой в каждом процессе)
 ukraine_events = PoliticalEventManager()
\ No newline at end of file
@@ -2,5 +2,6 @@
 
 from .rate_limiter import RateLimiter
 from .url_helper import ArchiveUrlHelper
+from .interval_tree import IntervalTree
 
-__all__ = ["RateLimiter", "ArchiveUrlHelper"]
\ No newline at end of file
+__all__ = ["RateLimiter", "ArchiveUrlHelper", "IntervalTree"]
\ No newline at end of file
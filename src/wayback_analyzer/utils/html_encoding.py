@@ -0,0 +1,84 @@
+"""Определение кодировки и декодирование HTML страниц."""
+
+import codecs
+import re
+from typing import Optional, Tuple
+
+# <meta charset="..."> и <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+# Объявление кодировки ищется только в начале документа (как в браузерах)
+_SNIFF_BYTES = 4096
+
+# Кодировка старых украинских сайтов, не объявивших свою кодировку
+FALLBACK_CHARSET = 'cp1251'
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _normalize_charset(charset: Optional[str]) -> Optional[str]:
+    """Каноническое имя кодировки Python (windows-1251 -> cp1251) или None для неизвестной."""
+    if not charset:
+        return None
+    try:
+        return codecs.lookup(charset.strip().strip('"\'')).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """
+    Кодировка из заголовка Content-Type.
+
+    В отличие от requests, не подставляет ISO-8859-1 для text/* без charset:
+    отсутствие объявления оставляется на определение по содержимому.
+    """
+    if not content_type:
+        return None
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset':
+            return _normalize_charset(value)
+    return None
+
+
+def sniff_meta_charset(raw: bytes) -> Optional[str]:
+    """Кодировка из <meta charset> в начале документа."""
+    match = _META_CHARSET_RE.search(raw, 0, _SNIFF_BYTES)
+    if match is None:
+        return None
+    return _normalize_charset(match.group(1).decode('ascii'))
+
+
+def decode_html(raw: bytes, declared: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Декодировать HTML в str.
+
+    Порядок: BOM, объявленная кодировка (заголовок ответа или метаданные
+    файла), UTF-8, <meta charset>, FALLBACK_CHARSET. Объявленная кодировка
+    и UTF-8 принимаются, только если байты декодируются без ошибок: так
+    страница, сохраненная в UTF-8, но с устаревшим <meta charset=windows-1251>,
+    читается правильно.
+
+    Returns:
+        (текст, каноническое имя использованной кодировки)
+    """
+    for bom, charset in _BOMS:
+        if raw.startswith(bom):
+            return raw.decode(charset, errors='replace'), codecs.lookup(charset).name
+
+    declared = _normalize_charset(declared)
+    for charset in (declared, 'utf-8'):
+        if charset is None:
+            continue
+        try:
+            return raw.decode(charset), charset
+        except UnicodeDecodeError:
+            pass
+
+    charset = sniff_meta_charset(raw) or FALLBACK_CHARSET
+    return raw.decode(charset, errors='replace'), charset
@@ -0,0 +1,87 @@
+"""Статическое дерево интервалов для запросов по диапазонам дат."""
+
+from typing import Generic, Iterable, List, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class IntervalTree(Generic[T]):
+    """
+    Неизменяемое дерево замкнутых целочисленных интервалов [lo, hi].
+
+    Интервалы хранятся в массивах, отсортированных по lo; неявное
+    сбалансированное дерево строится над ними делением пополам, а каждый
+    узел хранит максимальный hi своего поддерева. Поиск пересечений
+    отсекает поддеревья, целиком лежащие левее или правее запроса,
+    и работает за O(log n + k).
+
+    Даты передаются как порядковые номера (date.toordinal()), чтобы при
+    обходе сравнивались только int.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, T]]):
+        """
+        Args:
+            intervals: Тройки (lo, hi, значение)
+        """
+        items = sorted(intervals, key=lambda interval: interval[0])
+
+        self._lo: List[int] = [lo for lo, _, _ in items]
+        self._hi: List[int] = [hi for _, hi, _ in items]
+        self._values: List[T] = [value for _, _, value in items]
+        self._max_hi: List[int] = list(self._hi)
+
+        if items:
+            self._build(0, len(items))
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _build(self, left: int, right: int) -> int:
+        """Заполнить max_hi для поддерева на отрезке [left, right)."""
+        mid = (left + right) // 2
+        max_hi = self._hi[mid]
+
+        if left < mid:
+            max_hi = max(max_hi, self._build(left, mid))
+        if mid + 1 < right:
+            max_hi = max(max_hi, self._build(mid + 1, right))
+
+        self._max_hi[mid] = max_hi
+        return max_hi
+
+    def query(self, lo: int, hi: int) -> List[T]:
+        """
+        Найти значения интервалов, пересекающихся с [lo, hi].
+
+        Returns:
+            Значения в порядке возрастания начала интервала
+        """
+        result: List[T] = []
+        self._query(0, len(self._values), lo, hi, result)
+        return result
+
+    def stab(self, point: int) -> List[T]:
+        """Найти значения интервалов, содержащих точку."""
+        return self.query(point, point)
+
+    def _query(self, left: int, right: int, lo: int, hi: int, result: List[T]) -> None:
+        if left >= right:
+            return
+
+        mid = (left + right) // 2
+
+        # Все интервалы поддерева заканчиваются раньше начала запроса
+        if self._max_hi[mid] < lo:
+            return
+
+        self._query(left, mid, lo, hi, result)
+
+        # Узел и правое поддерево начинаются позже конца запроса
+        if self._lo[mid] > hi:
+            return
+
+        if self._hi[mid] >= lo:
+            result.append(self._values[mid])
+
+        self._query(mid + 1, right, lo, hi, result)
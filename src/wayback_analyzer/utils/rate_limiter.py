@@ -1,12 +1,17 @@
 """Rate limiter для контроля скорости запросов к архиву."""
 
+import asyncio
 import time
 import logging
 from typing import Optional
 
 
 class RateLimiter:
-    """Контролирует скорость запросов к Wayback Machine."""
+    """Контролирует скорость запросов к Wayback Machine.
+
+    Token bucket на монотонных часах: до burst_limit запросов проходят
+    сразу, дальше - не чаще одного запроса в delay секунд.
+    """
 
     def __init__(self, requests_per_second: float = 0.5, burst_limit: int = 3):
         """
@@ -16,41 +21,47 @@ class RateLimiter:
         """
         self.delay = 1.0 / requests_per_second
         self.burst_limit = burst_limit
-        self.last_request_time = 0.0
-        self.burst_count = 0
-        self.burst_start_time = 0.0
+        self._tokens = float(burst_limit)
+        self._last = time.monotonic()
 
         self.logger = logging.getLogger(__name__)
 
     def wait_if_needed(self) -> None:
         """Ожидать если необходимо соблюсти rate limit."""
-        current_time = time.time()
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
 
-        # Сброс burst счетчика если прошло много времени
-        if current_time - self.burst_start_time > 10.0:
-            self.burst_count = 0
-            self.burst_start_time = current_time
+    async def acquire(self) -> None:
+        """Асинхронный вариант wait_if_needed для корутин."""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
 
-        # Проверка burst лимита
-        if self.burst_count >= self.burst_limit:
-            wait_time = self.delay * 2  # Двойная задержка при превышении burst
-            self.logger.debug(f"Burst limit reached, waiting {wait_time:.2f}s")
-            time.sleep(wait_time)
-            self.burst_count = 0
-            self.burst_start_time = current_time
-
-        # Обычная задержка
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.delay:
-            wait_time = self.delay - time_since_last
-            self.logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
-            time.sleep(wait_time)
+    def _reserve(self) -> float:
+        """
+        Зарезервировать слот под следующий запрос.
+
+        Токен списывается сразу, до ожидания (баланс может уйти в минус),
+        поэтому параллельные корутины получают последовательные слоты,
+        а не один и тот же.
+
+        Returns:
+            Время ожидания в секундах до выполнения запроса
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst_limit, self._tokens + (now - self._last) / self.delay)
+        self._last = now
+
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
 
-        self.last_request_time = time.time()
-        self.burst_count += 1
+        wait_time = -self._tokens * self.delay
+        self.logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
+        return wait_time
 
     def reset(self) -> None:
         """Сбросить счетчики rate limiter."""
-        self.last_request_time = 0.0
-        self.burst_count = 0
-        self.burst_start_time = 0.0
\ No newline at end of file
+        self._tokens = float(self.burst_limit)
+        self._last = time.monotonic()
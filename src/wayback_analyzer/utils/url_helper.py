@@ -1,8 +1,42 @@
 """Помощник для работы с URL архива."""
 
 import re
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple, Union
+
+# Паттерн: https://web.archive.org/web/20201231013900/https://sluga-narodu.com/
+# Признак архивной ссылки: одна проверка подстроки вместо двух
+_ARCHIVE_MARKER = 'web.archive.org/web/'
+
+# Абсолютные архивные ссылки в сыром HTML (байты, без декодирования страницы);
+# оригинальный URL заканчивается на пробеле, кавычке или угловой скобке
+_ARCHIVE_URL_IN_HTML_RE = re.compile(rb'https?://web\.archive\.org/web/(\d{14})/([^\s"\'<>]+)')
+
+
+# Допустимые символы схемы URL (RFC 3986)
+_SCHEME_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+-.'
+
+
+@lru_cache(maxsize=4096)
+def _get_domain_cached(url: str) -> Optional[str]:
+    """
+    Получить домен из оригинального (не архивного) URL.
+
+    Netloc вырезается срезами строки без urlparse и ParseResult.
+    Как и у urlparse, у URL без схемы и без '//' домен пустой.
+    Кэш ключуется по оригинальному URL, поэтому разные снимки одной
+    страницы используют одну запись.
+    """
+    scheme, sep, rest = url.partition('://')
+    if not sep or not scheme or scheme.strip(_SCHEME_CHARS) or not scheme[0].isalpha():
+        # '://' не после схемы (например, в параметрах запроса)
+        if not url.startswith('//'):
+            return ''
+        rest = url[2:]
+
+    netloc = rest.partition('/')[0].partition('?')[0].partition('#')[0]
+    return netloc.lower()
 
 
 class ArchiveUrlHelper:
@@ -11,9 +45,10 @@ class ArchiveUrlHelper:
     @staticmethod
     def is_archive_url(url: str) -> bool:
         """Проверить, является ли URL архивным."""
-        return 'web.archive.org' in url and '/web/' in url
+        return _ARCHIVE_MARKER in url
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def extract_timestamp_and_original(archive_url: str) -> Tuple[Optional[str], Optional[str]]:
         """
         Извлечь timestamp и оригинальный URL из архивной ссылки.
@@ -21,22 +56,42 @@ class ArchiveUrlHelper:
         Returns:
             Tuple[timestamp, original_url] или (None, None) если не архивная ссылка
         """
-        if not ArchiveUrlHelper.is_archive_url(archive_url):
+        # Структура жёсткая: .../web/<14 цифр>/<оригинальный URL>,
+        # поэтому хватает partition и среза без регулярного выражения
+        _, marker, rest = archive_url.partition(_ARCHIVE_MARKER)
+        if not marker:
             return None, None
 
-        # Паттерн: https://web.archive.org/web/20201231013900/https://sluga-narodu.com/
-        pattern = r'web\.archive\.org/web/(\d{14})/(.+)'
-        match = re.search(pattern, archive_url)
+        timestamp, slash, original_url = rest.partition('/')
+        if not slash or not original_url or len(timestamp) != 14 or not timestamp.isdigit():
+            return None, None
+
+        # Добавляем протокол если его нет
+        if not original_url.startswith(('http://', 'https://')):
+            original_url = 'https://' + original_url
+        return timestamp, original_url
+
+    @staticmethod
+    def iter_archive_urls(html: Union[bytes, str]) -> Iterator[Tuple[str, str]]:
+        """
+        Найти все абсолютные архивные ссылки в HTML за один проход регулярного выражения.
+
+        Декодируются только найденные группы, а не вся страница.
+        Относительные ссылки не находятся - для них нужен разбор DOM.
 
-        if match:
-            timestamp = match.group(1)
-            original_url = match.group(2)
+        Yields:
+            Tuple[timestamp, original_url]
+        """
+        if isinstance(html, str):
+            html = html.encode('utf-8', 'surrogateescape')
+
+        for match in _ARCHIVE_URL_IN_HTML_RE.finditer(html):
+            timestamp = match.group(1).decode('ascii')
+            original_url = match.group(2).decode('utf-8', 'replace')
             # Добавляем протокол если его нет
             if not original_url.startswith(('http://', 'https://')):
                 original_url = 'https://' + original_url
-            return timestamp, original_url
-
-        return None, None
+            yield timestamp, original_url
 
     @staticmethod
     def build_archive_url(timestamp: str, original_url: str) -> str:
@@ -71,18 +126,27 @@ class ArchiveUrlHelper:
         return ArchiveUrlHelper.build_archive_url(timestamp, full_original)
 
     @staticmethod
-    def get_domain(url: str) -> Optional[str]:
-        """Получить домен из URL."""
-        try:
-            if ArchiveUrlHelper.is_archive_url(url):
-                _, original_url = ArchiveUrlHelper.extract_timestamp_and_original(url)
-                if original_url:
-                    url = original_url
-
-            parsed = urlparse(url)
-            return parsed.netloc.lower()
-        except:
-            return None
+    def get_domain(url: str, strict: bool = False) -> Optional[str]:
+        """
+        Получить домен из URL.
+
+        Args:
+            url: Обычный или архивный URL
+            strict: Разбирать через urlparse (крайние случаи RFC 3986,
+                ошибка в IPv6-адресе дает None)
+        """
+        if ArchiveUrlHelper.is_archive_url(url):
+            _, original_url = ArchiveUrlHelper.extract_timestamp_and_original(url)
+            if original_url:
+                url = original_url
+
+        if strict:
+            try:
+                return urlparse(url).netloc.lower()
+            except ValueError:
+                return None
+
+        return _get_domain_cached(url)
 
     @staticmethod
     def is_same_domain(url1: str, url2: str) -> bool:
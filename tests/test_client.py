@@ -13,4 +13,32 @@ def test_wayback_client_creation():
 def test_wayback_client_custom_user_agent():
     """Test WaybackClient with custom user agent."""
     client = WaybackClient(user_agent="TestBot/1.0")
-    assert client.user_agent == "TestBot/1.0"
\ No newline at end of file
+    assert client.user_agent == "TestBot/1.0"
+
+def test_get_snapshots_passes_limit_to_cdx(monkeypatch):
+    """Test limit is sent to the CDX server and no extra rows are consumed."""
+    consumed = []
+
+    class FakeSnapshot:
+        def __init__(self, n):
+            self.archive_url = f"https://web.archive.org/web/{n}/http://example.com"
+
+    class FakeCDX:
+        def __init__(self, url, user_agent, limit=None):
+            self.limit = limit
+            FakeCDX.instance = self
+
+        def snapshots(self):
+            for n in range(100):
+                consumed.append(n)
+                yield FakeSnapshot(n)
+
+    monkeypatch.setattr(
+        "wayback_analyzer.core.client.WaybackMachineCDXServerAPI", FakeCDX
+    )
+
+    snapshots = WaybackClient().get_snapshots("http://example.com", limit=3)
+
+    assert FakeCDX.instance.limit == 3
+    assert len(snapshots) == 3
+    assert consumed == [0, 1, 2]
@@ -0,0 +1,31 @@
+"""Тесты извлечения контента из сохраненных HTML страниц."""
+
+import pytest
+
+from wayback_analyzer.core.content_extractor import PoliticalContentExtractor
+
+TITLE = 'Програма партії'
+BODY = 'Ми проведемо реформа судів і переможемо корупція в країні.'
+
+
+@pytest.mark.parametrize('file_charset, meta_charset', [
+    ('cp1251', 'windows-1251'),
+    ('koi8-u', 'koi8-u'),
+    # Страница, сохраненная в UTF-8, с устаревшим объявлением исходной кодировки
+    ('utf-8', 'windows-1251'),
+])
+def test_extract_from_non_utf8_file(tmp_path, file_charset, meta_charset):
+    """Тест: файл не в UTF-8 декодируется по <meta charset>, а не как UTF-8."""
+    html = (
+        f'<html><head><meta charset="{meta_charset}"><title>{TITLE}</title></head>'
+        f'<body><main><p>{BODY}</p></main></body></html>'
+    )
+    file_path = tmp_path / 'page.html'
+    file_path.write_bytes(html.encode(file_charset))
+
+    content = PoliticalContentExtractor().extract_from_html_file(file_path, has_meta=False)
+
+    assert content.title == TITLE
+    assert BODY in content.main_text
+    assert 'общие: реформа' in content.political_keywords
+    assert 'критика: корупція' in content.political_keywords
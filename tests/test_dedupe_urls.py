@@ -0,0 +1,129 @@
+"""Тесты дедупликации URL из dedupe_urls.py."""
+
+import random
+
+import pytest
+
+import dedupe_urls
+from dedupe_urls import _NUM_SUFFIX_RE, _dedup_items, content_normalize_url, normalize_url
+
+
+def _two_stage_reference(items):
+    """Прежняя двухэтапная дедупликация: протокольная, затем контентная."""
+    protocol_dedup = {}
+    for item in items:
+        normalized = normalize_url(item['original'])
+        current = protocol_dedup.get(normalized)
+        is_https = item['original'].startswith('https://')
+        if current is None:
+            protocol_dedup[normalized] = item
+            continue
+        current_is_https = current['original'].startswith('https://')
+        if (is_https and not current_is_https) or \
+                (is_https == current_is_https and item['size'] > current['size']):
+            protocol_dedup[normalized] = item
+
+    content_dedup = {}
+    for item in protocol_dedup.values():
+        url = item['original']
+        content_key = content_normalize_url(url)
+        has_number = _NUM_SUFFIX_RE.search(url) is not None
+        current = content_dedup.get(content_key)
+        if current is None:
+            content_dedup[content_key] = item
+            continue
+        current_has_number = _NUM_SUFFIX_RE.search(current['original']) is not None
+        if (not has_number and current_has_number) or \
+                (has_number == current_has_number and item['size'] > current['size']):
+            content_dedup[content_key] = item
+
+    return list(content_dedup.values())
+
+
+def _random_items(rng, count, schemes=('https',)):
+    """URL с малым разбросом размеров (много равенств); по умолчанию уже нормализованные HTTPS."""
+    items = []
+    for i in range(count):
+        scheme = rng.choice(schemes)
+        path = rng.choice(['news', 'news-2', 'about', 'about-3', 'blog/post', 'blog/post-1'])
+        query = rng.choice(['', '?a=1', '?b=2', '#top'])
+        items.append({
+            'original': f"{scheme}://example.com/{path}{query}",
+            'size': rng.randint(1, 3),
+            'id': i,
+        })
+    return items
+
+
+def _survivors(state):
+    return sorted(item['id'] for item in state.items)
+
+
+def test_dedup_tie_keeps_first_seen_url():
+    """При равных приоритетах побеждает раньше встреченный нормализованный URL."""
+    items = [
+        {'original': 'http://example.com/page?a=1', 'size': 5, 'id': 0},
+        {'original': 'https://example.com/page?b=2', 'size': 5, 'id': 1},
+        {'original': 'https://example.com/page?a=1', 'size': 5, 'id': 2},
+    ]
+
+    state, total = _dedup_items(items, workers=1)
+
+    assert total == 3
+    assert _survivors(state) == [2]
+    assert _survivors(state) == sorted(item['id'] for item in _two_stage_reference(items))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_dedup_matches_two_stage_reference(seed):
+    """На нормализованных HTTPS URL один проход совпадает с прежними двумя этапами."""
+    items = _random_items(random.Random(seed), 60)
+
+    state, _ = _dedup_items(items, workers=1)
+
+    assert _survivors(state) == sorted(item['id'] for item in _two_stage_reference(items))
+
+
+def test_dedup_merges_protocol_variants_of_content_group():
+    """HTTP и HTTPS варианты одной контентной группы сливаются, HTTPS побеждает."""
+    items = [
+        {'original': 'http://example.com/page?a=1', 'size': 100, 'id': 0},
+        {'original': 'https://example.com/page?b=2', 'size': 10, 'id': 1},
+    ]
+
+    state, _ = _dedup_items(items, workers=1)
+
+    assert _survivors(state) == [1]
+    # Прежняя версия держала их в разных группах: ключ включал схему
+    assert len(_two_stage_reference(items)) == 2
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_dedup_parallel_matches_single_pass(monkeypatch, seed):
+    """Обработка по шардам в процессах дает тот же результат и порядок, что и один проход."""
+    items = _random_items(random.Random(seed), 200, schemes=('http', 'https'))
+    expected, _ = _dedup_items(items, workers=1)
+
+    monkeypatch.setattr(dedupe_urls, 'PARALLEL_THRESHOLD', 30)
+    monkeypatch.setattr(dedupe_urls, 'CHUNK_SIZE', 17)
+    state, total = _dedup_items(items, workers=2)
+
+    assert total == len(items)
+    assert [item['id'] for item in state.items] == [item['id'] for item in expected.items]
+
+
+def test_dedup_parallel_tie_uses_global_first_seen(monkeypatch):
+    """Равенство внутри шарды решается по первому появлению URL во всем входе."""
+    items = [
+        {'original': 'http://example.com/page?a=1', 'size': 5, 'id': 0},
+        {'original': 'https://example.com/page?b=2', 'size': 10, 'id': 1},
+        {'original': 'https://example.com/page?a=1', 'size': 10, 'id': 2},
+    ]
+    expected, _ = _dedup_items(items, workers=1)
+
+    monkeypatch.setattr(dedupe_urls, 'PARALLEL_THRESHOLD', 1)
+    monkeypatch.setattr(dedupe_urls, 'CHUNK_SIZE', 2)
+    state, _ = _dedup_items(items, workers=2)
+
+    assert _survivors(expected) == [2]
+    assert _survivors(state) == [2]
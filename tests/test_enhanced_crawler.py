@@ -0,0 +1,115 @@
+"""Тесты обработки страниц в EnhancedSnapshotCrawler."""
+
+import orjson
+import pytest
+
+from wayback_analyzer.core.enhanced_crawler import EnhancedSnapshotCrawler
+from wayback_analyzer.core.storage_manager import StorageManager
+from wayback_analyzer.utils.rate_limiter import RateLimiter
+
+ARCHIVE_URL = 'https://web.archive.org/web/20190401000000/https://sluga-narodu.com/about'
+TITLE = 'Про партію Слуга народу'
+
+
+@pytest.fixture
+def crawler(tmp_path):
+    return EnhancedSnapshotCrawler(
+        StorageManager(tmp_path),
+        RateLimiter(requests_per_second=1000),
+        resume_mode=False
+    )
+
+
+@pytest.mark.parametrize('charset, content_type', [
+    ('cp1251', 'text/html; charset=windows-1251'),
+    ('cp1251', 'text/html'),
+    ('koi8-u', 'text/html'),
+])
+def test_non_utf8_page_saved_as_utf8(crawler, charset, content_type):
+    """Тест: страница не в UTF-8 сохраняется декодированной, с исходной кодировкой в метаданных."""
+    raw = (
+        f'<html><head><meta charset="{charset}"><title>{TITLE}</title></head>'
+        f'<body><a href="/news">Новини</a></body></html>'
+    ).encode(charset)
+
+    html, detected = crawler._decode_body(ARCHIVE_URL, raw, content_type)
+    page_info, links = crawler._process_page(
+        ARCHIVE_URL, html, 12.5, 'sluga-narodu.com', 0, len(raw), detected
+    )
+
+    assert detected == charset
+    assert page_info['title'] == TITLE
+    assert page_info['source_charset'] == charset
+    assert page_info['content_length'] == len(raw)
+    assert page_info['links_found'] == 1
+    assert page_info['images_found'] == 0
+    assert links == ['https://web.archive.org/web/20190401000000/https://sluga-narodu.com/news']
+
+    saved_path = crawler.storage_manager.get_page_path(ARCHIVE_URL)
+    assert TITLE in saved_path.read_text(encoding='utf-8')
+
+    metadata = orjson.loads(saved_path.with_name(saved_path.name + '.meta.json').read_bytes())
+    assert metadata['source_charset'] == charset
+
+
+def test_detailed_metrics_skipped_for_large_page(crawler):
+    """Тест: ссылки и изображения не считаются для страниц больше detailed_metrics_max_bytes."""
+    crawler.detailed_metrics_max_bytes = 10
+    html = '<html><body><a href="/news">Новини</a><img src="/logo.png"></body></html>'
+
+    page_info, _ = crawler._process_page(ARCHIVE_URL, html, 1.0, 'sluga-narodu.com', 0, len(html), 'utf-8')
+
+    assert 'links_found' not in page_info
+    assert 'images_found' not in page_info
+
+
+def test_oversized_page_skipped(crawler):
+    """Тест: страница больше max_page_bytes не декодируется и попадает в skipped_urls."""
+    crawler.max_page_bytes = 10
+
+    assert crawler._decode_body(ARCHIVE_URL, b'x' * 11, 'text/html') is None
+    assert crawler.skipped_urls == [ARCHIVE_URL]
+
+
+def test_journal_written_after_background_save(crawler):
+    """Тест: при фоновой записи журнал пишется после сохранения, page_info не меняется."""
+    raw = f'<html><head><title>{TITLE}</title></head><body></body></html>'.encode('utf-8')
+
+    crawler._open_state_journal(ARCHIVE_URL)
+    crawler._start_writer()
+    page_info, _ = crawler._process_page(
+        ARCHIVE_URL, raw.decode('utf-8'), 1.0, 'sluga-narodu.com', 0, len(raw), 'utf-8'
+    )
+    crawler._record_page(page_info)
+    crawler._stop_writer()
+    crawler._close_state_journal()
+
+    saved_path = crawler.storage_manager.get_page_path(ARCHIVE_URL)
+    assert page_info['saved_to'] == str(saved_path)
+    assert saved_path.exists()
+    # Поля, добавляемые StorageManager, не попадают в found_pages
+    assert 'file_path' not in page_info
+
+    journal = crawler.storage_manager.get_snapshot_path(ARCHIVE_URL) / 'crawler_state.jsonl'
+    lines = journal.read_bytes().splitlines()
+    assert [orjson.loads(line) for line in lines] == [page_info]
+
+
+def test_failed_background_save_not_journaled(crawler, monkeypatch):
+    """Тест: страница, которую не удалось записать, не попадает в журнал."""
+    def fail_save(**kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(crawler.storage_manager, 'save_page_content', fail_save)
+    raw = f'<html><head><title>{TITLE}</title></head><body></body></html>'
+
+    crawler._open_state_journal(ARCHIVE_URL)
+    crawler._start_writer()
+    page_info, _ = crawler._process_page(ARCHIVE_URL, raw, 1.0, 'sluga-narodu.com', 0, len(raw), 'utf-8')
+    crawler._record_page(page_info)
+    crawler._stop_writer()
+    crawler._close_state_journal()
+
+    journal = crawler.storage_manager.get_snapshot_path(ARCHIVE_URL) / 'crawler_state.jsonl'
+    assert journal.read_bytes() == b''
+    assert crawler.failed_urls[0]['error_type'] == 'WriteError'
@@ -0,0 +1,81 @@
+"""Тесты определения кодировки HTML страниц."""
+
+import pytest
+
+from wayback_analyzer.utils.html_encoding import (
+    charset_from_content_type,
+    decode_html,
+    sniff_meta_charset,
+)
+
+TEXT = 'Слуга народу: програма партії'
+
+
+@pytest.mark.parametrize('content_type, expected', [
+    ('text/html; charset=windows-1251', 'cp1251'),
+    ('text/html; Charset="KOI8-R"', 'koi8-r'),
+    ('text/html;charset=utf-8', 'utf-8'),
+    ('text/html', None),
+    ('text/html; charset=unknown-charset', None),
+    (None, None),
+])
+def test_charset_from_content_type(content_type, expected):
+    """Тест разбора charset из Content-Type (без подстановки ISO-8859-1)."""
+    assert charset_from_content_type(content_type) == expected
+
+
+def test_sniff_meta_charset():
+    """Тест поиска кодировки в <meta> в начале документа."""
+    assert sniff_meta_charset(b'<html><head><meta charset="windows-1251">') == 'cp1251'
+    assert sniff_meta_charset(
+        b'<meta http-equiv="Content-Type" content="text/html; charset=koi8-r">'
+    ) == 'koi8-r'
+    assert sniff_meta_charset(b'<html><head><title>x</title>') is None
+
+
+def test_decode_html_declared_charset():
+    """Тест декодирования по кодировке из заголовка ответа."""
+    raw = f'<html><title>{TEXT}</title></html>'.encode('cp1251')
+
+    html, charset = decode_html(raw, 'windows-1251')
+
+    assert TEXT in html
+    assert charset == 'cp1251'
+
+
+def test_decode_html_meta_charset():
+    """Тест декодирования по <meta charset> без заголовка."""
+    raw = f'<html><head><meta charset="koi8-u"></head><body>{TEXT}</body></html>'.encode('koi8-u')
+
+    html, charset = decode_html(raw)
+
+    assert TEXT in html
+    assert charset == 'koi8-u'
+
+
+def test_decode_html_utf8_wins_over_stale_meta():
+    """Тест: страница в UTF-8 с устаревшим <meta charset=windows-1251> читается как UTF-8."""
+    raw = f'<html><head><meta charset="windows-1251"></head><body>{TEXT}</body></html>'.encode('utf-8')
+
+    html, charset = decode_html(raw)
+
+    assert TEXT in html
+    assert charset == 'utf-8'
+
+
+def test_decode_html_wrong_declared_charset_falls_through():
+    """Тест: объявленная UTF-8 кодировка, не подходящая к байтам, не дает кракозябр."""
+    raw = f'<html><body>{TEXT}</body></html>'.encode('cp1251')
+
+    html, charset = decode_html(raw, 'utf-8')
+
+    assert TEXT in html
+    assert charset == 'cp1251'
+
+
+def test_decode_html_bom():
+    """Тест декодирования по BOM."""
+    html, charset = decode_html(('﻿' + TEXT).encode('utf-8'), 'cp1251')
+
+    assert html == TEXT
+    assert charset == 'utf-8-sig'
@@ -1,5 +1,9 @@
 """Тесты для моделей политических событий."""
 
+import dataclasses
+import pickle
+
+import orjson
 import pytest
 from datetime import date, timedelta
 from wayback_analyzer.models import (
@@ -76,6 +80,27 @@ def test_political_event_is_in_range():
     assert event.is_in_range(date(2020, 7, 1)) == False
 
 
+def test_political_event_asdict():
+    """Тест: производные значения не попадают в asdict(), событие неизменяемо."""
+    event = PoliticalEvent(
+        name="Тест",
+        date=date(2020, 6, 15),
+        event_type=EventType.COVID,
+        description="Тест",
+        tags=["covid", "карантин"]
+    )
+
+    data = dataclasses.asdict(event)
+
+    assert set(data) == {field.name for field in dataclasses.fields(PoliticalEvent)}
+    assert not any(name.startswith('_') for name in data)
+    assert orjson.loads(orjson.dumps(data))['tags'] == ["covid", "карантин"]
+
+    # Изменение поля сделало бы кэшированное окно анализа устаревшим
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        event.analysis_window_days_before = 5
+
+
 def test_ukraine_events_loaded():
     """Тест загрузки украинских событий."""
     assert len(UKRAINE_POLITICAL_EVENTS) > 0
@@ -132,6 +157,57 @@ def test_event_manager_near_date():
     assert len(near_war) > 0
 
 
+def test_event_manager_events_covering():
+    """Тест поиска событий, в окно анализа которых попадает дата."""
+    manager = PoliticalEventManager()
+
+    # Начало войны попадает в окно самого события
+    covering = manager.events_covering(date(2022, 2, 24))
+    assert any(event.date == date(2022, 2, 24) for event in covering)
+
+    # Результат совпадает с перебором через is_in_range
+    check_date = date(2019, 4, 1)
+    for buffer_days in (0, 10):
+        expected = {
+            event.name for event in manager.events
+            if event.is_in_range(check_date, buffer_days)
+        }
+        assert {event.name for event in manager.events_covering(check_date, buffer_days)} == expected
+
+
+def test_event_manager_events_covering_many():
+    """Тест поиска покрывающих событий для набора дат снимков."""
+    manager = PoliticalEventManager()
+    snapshot_dates = [date(2019, 4, 1), date(2022, 2, 24), date(2019, 4, 1), date(2000, 1, 1)]
+
+    covering = manager.events_covering_many(snapshot_dates, buffer_days=5)
+
+    assert set(covering) == set(snapshot_dates)
+    assert covering[date(2000, 1, 1)] == []
+    for check_date, events in covering.items():
+        assert events == manager.events_covering(check_date, buffer_days=5)
+
+
+def test_event_manager_pickle():
+    """Тест передачи менеджера между процессами через pickle."""
+    manager = PoliticalEventManager()
+    payload = pickle.dumps(manager)
+
+    # Предопределенные события не копируются в сериализованные данные
+    assert len(payload) < len(pickle.dumps(manager.events))
+    assert pickle.loads(payload).events == manager.events
+
+    manager.add_custom_event(PoliticalEvent(
+        name="Тестовое событие",
+        date=date(2021, 5, 5),
+        event_type=EventType.ECONOMIC,
+        description="Пользовательское событие"
+    ))
+    restored = pickle.loads(pickle.dumps(manager))
+    assert restored.events == manager.events
+    assert restored.get_events_in_date_range(date(2021, 5, 5), date(2021, 5, 5))
+
+
 def test_event_filter():
     """Тест фильтрации событий."""
     manager = PoliticalEventManager()
@@ -152,6 +228,54 @@ def test_event_filter():
     )
 
 
+def test_event_filter_from_dict():
+    """Тест создания фильтра из словаря со строковыми значениями."""
+    event_filter = EventFilter.from_dict({
+        'event_types': ['election'],
+        'importance_levels': ['critical'],
+        'date_from': '2019-01-01',
+    })
+
+    assert event_filter.event_types == [EventType.ELECTION]
+    assert event_filter.importance_levels == [EventImportance.CRITICAL]
+    assert event_filter.date_from == date(2019, 1, 1)
+    assert event_filter.date_to is None
+
+
+def test_event_filter_coerces_strings():
+    """Тест: фильтр, созданный напрямую со строками, работает как с перечислениями."""
+    manager = PoliticalEventManager()
+    expected = manager.get_events_by_filter(EventFilter(
+        event_types=[EventType.ELECTION],
+        importance_levels=[EventImportance.CRITICAL],
+        date_from=date(2019, 1, 1),
+        date_to=date(2019, 12, 31)
+    ))
+
+    direct = EventFilter(
+        event_types=['election'],
+        importance_levels=['critical'],
+        date_from='2019-01-01',
+        date_to='2019-12-31'
+    )
+    from_dict = EventFilter.from_dict({
+        'event_types': ['election'],
+        'importance_levels': ['critical'],
+        'date_from': '2019-01-01',
+        'date_to': '2019-12-31',
+    })
+
+    assert direct == from_dict
+    assert direct.event_types == [EventType.ELECTION]
+    assert direct.date_to == date(2019, 12, 31)
+    assert expected
+    assert manager.get_events_by_filter(direct) == expected
+    assert manager.get_events_by_filter(from_dict) == expected
+
+    with pytest.raises(ValueError):
+        EventFilter(event_types=['unknown'])
+
+
 def test_global_ukraine_events():
     """Тест глобального экземпляра событий."""
     assert ukraine_events is not None
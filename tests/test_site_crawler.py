@@ -0,0 +1,43 @@
+"""Тесты ArchiveSiteCrawler."""
+
+from wayback_analyzer.core.site_crawler import ArchiveSiteCrawler
+from wayback_analyzer.utils.rate_limiter import RateLimiter
+
+ARCHIVE_URL = 'https://web.archive.org/web/20190401000000/https://sluga-narodu.com/'
+
+
+class FakeResponse:
+    status_code = 200
+    content = '<html><head><title>Слуга народу</title></head><body></body></html>'.encode('utf-8')
+    headers = {'Content-Type': 'text/html; charset=utf-8'}
+
+
+class FakeSession:
+    """Сессия requests, считающая запросы и закрытия."""
+
+    def __init__(self):
+        self.headers = {}
+        self.requests = 0
+        self.closed = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return FakeResponse()
+
+    def close(self):
+        self.closed += 1
+
+
+def test_session_reused_between_snapshots():
+    """Тест: session остается открытой между обходами и закрывается только в close()."""
+    session = FakeSession()
+
+    with ArchiveSiteCrawler(RateLimiter(requests_per_second=1000), max_depth=0) as crawler:
+        crawler.session = session
+        crawler.discover_site_structure(ARCHIVE_URL, 'sluga-narodu.com')
+        crawler.discover_site_structure(ARCHIVE_URL.replace('20190401', '20190501'), 'sluga-narodu.com')
+
+        assert session.requests == 2
+        assert session.closed == 0
+
+    assert session.closed == 1
@@ -0,0 +1,110 @@
+"""Тесты загрузки страниц в SnapshotCrawler и AsyncSnapshotCrawler."""
+
+import asyncio
+
+import pytest
+
+from wayback_analyzer.core.snapshot_crawler import AsyncSnapshotCrawler, SnapshotCrawler
+from wayback_analyzer.core.storage_manager import StorageManager
+from wayback_analyzer.utils.rate_limiter import RateLimiter
+
+ARCHIVE_URL = 'https://web.archive.org/web/20190401000000/https://sluga-narodu.com/about'
+TITLE = 'Про партію Слуга народу'
+CONTENT_TYPE = 'text/html'
+
+
+def _page(charset):
+    return f'<html><head><title>{TITLE}</title></head><body></body></html>'.encode(charset)
+
+
+class FakeResponse:
+    def __init__(self, content, content_type):
+        self.status_code = 200
+        self.status = 200
+        self.content = content
+        self.headers = {'Content-Type': content_type}
+
+    async def read(self):
+        return self.content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    """Сессия requests/aiohttp, отдающая одну и ту же страницу."""
+
+    def __init__(self, content, content_type=CONTENT_TYPE):
+        self.content = content
+        self.content_type = content_type
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.content, self.content_type)
+
+
+def _crawler(cls, tmp_path, **kwargs):
+    return cls(StorageManager(tmp_path), RateLimiter(requests_per_second=1000), **kwargs)
+
+
+def _saved_html(crawler):
+    return crawler.storage_manager.get_page_path(ARCHIVE_URL).read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('charset', ['cp1251', 'koi8-u'])
+def test_sync_crawler_decodes_non_utf8_page(tmp_path, charset):
+    """Тест: text/html без charset декодируется по содержимому, а не как ISO-8859-1."""
+    crawler = _crawler(SnapshotCrawler, tmp_path)
+    raw = _page(charset)
+    if charset == 'koi8-u':
+        raw = raw.replace(b'<head>', b'<head><meta charset="koi8-u">')
+    crawler.session = FakeSession(raw)
+
+    crawler._crawl_page(ARCHIVE_URL, 'sluga-narodu.com', 0)
+
+    assert crawler.found_pages[0]['title'] == TITLE
+    assert crawler.found_pages[0]['source_charset'] == charset
+    assert TITLE in _saved_html(crawler)
+
+
+def test_async_crawler_decodes_non_utf8_page(tmp_path):
+    """Тест: асинхронный краулер декодирует cp1251 страницу и сохраняет ее в UTF-8."""
+    crawler = _crawler(AsyncSnapshotCrawler, tmp_path)
+
+    asyncio.run(crawler._crawl_page(FakeSession(_page('cp1251')), ARCHIVE_URL, 'sluga-narodu.com', 0))
+
+    assert crawler.found_pages[0]['title'] == TITLE
+    assert crawler.found_pages[0]['source_charset'] == 'cp1251'
+    assert TITLE in _saved_html(crawler)
+
+
+class SlowSession(FakeSession):
+    """Сессия, отдающая тело ответа с задержкой (несколько корутин ждут одновременно)."""
+
+    def get(self, url, **kwargs):
+        response = FakeResponse(self.content, self.content_type)
+
+        async def read():
+            await asyncio.sleep(0.01)
+            return response.content
+
+        response.read = read
+        return response
+
+
+def test_async_crawler_respects_max_pages_after_body_read(tmp_path):
+    """Тест: лимит max_pages проверяется после загрузки тела, а не только до нее."""
+    crawler = _crawler(AsyncSnapshotCrawler, tmp_path, max_pages=2, max_concurrent=5)
+    session = SlowSession(_page('utf-8'))
+    urls = [f'{ARCHIVE_URL}-{n}' for n in range(5)]
+
+    async def crawl():
+        await asyncio.gather(*(
+            crawler._crawl_page(session, url, 'sluga-narodu.com', 0) for url in urls
+        ))
+
+    asyncio.run(crawl())
+
+    assert len(crawler.found_pages) == 2